@@ -0,0 +1,164 @@
+"""
+Batch clustering of many small graphs with Bridge Cut.
+
+The graphs are read from a manifest (one edge list file per line) or
+from a single multi-graph file, where a line starting with "#" names the
+graph whose edges follow.  Every graph is clustered with every chosen
+version on a pool of processes, and one line per graph and version is
+written to the output:
+
+    name, version, DB index, silhouette, clusters...
+
+all separated by tabs, with the nodes of a cluster separated by ", ".
+A graph without edges can't be clustered, its lines have "skipped" and
+"no edges" in place of the metrics and no clusters.
+
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+from bridgecut.core import BridgeCut
+from bridgecut.graph.core import Graph
+
+import getopt
+import multiprocessing
+import sys
+
+def cluster(task):
+    """
+    Clusters one graph with every version, returns the output lines.
+    
+    Key arguments:
+    task -- the graph name, its items, the versions and the execute arguments.
+    """
+    name, items, versions, args = task
+    
+    # Every graph gets its lines, even one that can't be clustered.
+    if not items:
+        return ''.join(['\t'.join([name, v, 'skipped', 'no edges']) + '\n' for v in versions])
+    
+    graph = Graph.factory(items)
+    
+    lines = []
+    for v in versions:
+        _, clusters = BridgeCut.factory(v, graph).execute(*args)
+        
+        davies_bouldin = BridgeCut.davies_bouldin(graph, clusters)
+        silhouette = BridgeCut.silhouette(graph, clusters)
+        
+        line = [name, v, str(davies_bouldin), str(silhouette)]
+        line.extend([str(c) for c in clusters])
+        lines.append('\t'.join(line) + '\n')
+    
+    return ''.join(lines)
+
+def graphs(opts):
+    """
+    Yields the name and items of every graph to cluster.
+    
+    Key arguments:
+    opts -- the command line arguments.
+    """
+    if 'm' in opts:
+        for line in open(opts['m'], 'r'):
+            name = line.strip()
+            if name:
+                handle = open(name, 'r')
+                items = parse(handle)
+                handle.close()
+                yield name, items
+    else:
+        name = None
+        items = []
+        for line in open(opts['g'], 'r'):
+            if line.startswith('#'):
+                if name != None or items:
+                    yield name, items
+                name = line[1:].strip()
+                items = []
+            else:
+                items.extend(parse([line]))
+        if name != None or items:
+            yield name, items
+
+def main():
+    """Main execution method."""
+    # Determine command line arguments.
+    try:
+        rawopts, _ = getopt.getopt(sys.argv[1:], "m:g:o:v:t:es:c:l:p:n:")
+    except getopt.GetoptError:
+        usage()
+        sys.exit(2)
+    
+    opts = {}
+    
+    # Process each command line argument.
+    for o, a in rawopts:
+        opts[o[1]] = a
+    
+    # The following arguments are required in all cases.
+    for opt in ['o', 'v', 't']:
+        if not opt in opts:
+            usage()
+            sys.exit(2)
+    
+    # Exactly one source of graphs.
+    if ('m' in opts) == ('g' in opts):
+        usage()
+        sys.exit(2)
+    
+    # Make sure the versions exist.
+    versions = opts['v'].split(',')
+    for v in versions:
+        if not v in BridgeCut.VERSIONS:
+            usage()
+            sys.exit(2)
+    
+    # The same execute arguments as main.py.
+    args = (float(opts['t']), 'e' in opts, int(opts.get('s', 1)), int(opts.get('c', 0)), float(opts.get('l', 0)))
+    
+    tasks = ((name, items, versions, args) for name, items in graphs(opts))
+    
+    # Hand the graphs out in chunks, small graphs are cheaper to cluster than to send.
+    pool = multiprocessing.Pool(int(opts.get('p', multiprocessing.cpu_count())))
+    
+    out = open(opts['o'], 'w')
+    for lines in pool.imap(cluster, tasks, int(opts.get('n', 16))):
+        out.write(lines)
+    out.close()
+    
+    pool.close()
+    pool.join()
+
+def parse(lines):
+    """
+    Returns the items of an edge list.
+    
+    Key arguments:
+    lines -- the lines of the edge list.
+    """
+    items = [line.replace('\t', ' ').replace('\n', '').replace('\r', '').split(' ') for line in lines]
+    return [item[:2] for item in items if len(item) >= 2]
+
+def usage():
+    """Prints the usage of the program."""
+    print("\n" +
+          "The following are arguments required:\n" +
+          "-m: the manifest, one edge list file per line (or -g).\n" +
+          "-g: the multi-graph file, \"# name\" lines start each graph (or -m).\n" +
+          "-o: the output file.\n" +
+          "-v: the bridge cut versions, comma separated (" + ", ".join(BridgeCut.VERSIONS) + ").\n" +
+          "-t: the density threshold.\n" +
+          "\n" +
+          "The following arguments are optional:\n" +
+          "-e, -s, -c, -l: early termination and caps, see main.py.\n" +
+          "-p: the number of processes (default one per cpu).\n" +
+          "-n: the number of graphs handed to a process at once (default 16).\n" +
+          "\n" +
+          "Example Usage:\n" +
+          "python batch.py -m \"manifest.txt\" -o \"batch.txt\" -v \"edge-c,vertex-c\" -t .3" +
+          "\n")
+
+"""Main execution."""
+if __name__ == "__main__":
+    main()
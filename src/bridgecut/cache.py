@@ -0,0 +1,122 @@
+"""
+Result cache.
+
+@package bridgecut
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+import cPickle
+import hashlib
+import os
+import zlib
+
+class Cache(object):
+    
+    # Bump whenever the algorithms or the entry layout change.
+    REVISION = 4
+    
+    # Default size limit in bytes.
+    SIZE = 100 * 1024 * 1024
+    
+    @classmethod
+    def key(cls, items, v, t, *options):
+        """
+        Returns the key of a run.
+        
+        The edges are hashed in the order of the file.  The node and edge
+        order break ties between equal scores, so a reordered copy of a
+        graph may cut differently and isn't the same run.
+        
+        Key arguments:
+        items   -- the edges of the graph.
+        v       -- the version.
+        t       -- the density threshold.
+        options -- any other options of the run.
+        """
+        h = hashlib.sha1()
+        h.update(repr((cls.REVISION, v, float(t)) + tuple(options)))
+        for item in items:
+            h.update(item[0] + ' ' + item[1] + '\n')
+        
+        return h.hexdigest()
+    
+    def __init__(self, path, size=None):
+        """
+        Init.
+        
+        Key arguments:
+        path -- directory of the cache.
+        size -- the most bytes the cache may use. [optional]
+        """
+        self.path = path
+        self.size = size or self.SIZE
+        
+        if not os.path.isdir(path):
+            os.makedirs(path)
+    
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits.
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.path):
+            try:
+                stat = os.stat(os.path.join(self.path, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, name, stat.st_size))
+            total += stat.st_size
+        
+        entries.sort()
+        while entries and total > self.size:
+            _, name, size = entries.pop(0)
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+            total -= size
+    
+    def get(self, key):
+        """
+        Returns the entry of a key, or None if it isn't cached.
+        
+        Key arguments:
+        key -- the key.
+        """
+        name = os.path.join(self.path, key)
+        try:
+            handle = open(name, 'rb')
+            try:
+                entry = cPickle.loads(zlib.decompress(handle.read()))
+            finally:
+                handle.close()
+        except (EnvironmentError, ValueError, EOFError, zlib.error, cPickle.UnpicklingError):
+            return None
+        
+        # Mark as recently used.
+        try:
+            os.utime(name, None)
+        except OSError:
+            pass
+        
+        return entry
+    
+    def put(self, key, entry):
+        """
+        Stores the entry of a key.
+        
+        Key arguments:
+        key   -- the key.
+        entry -- the entry (results, clusters, scores and memory report).
+        """
+        name = os.path.join(self.path, key)
+        
+        # Write then rename, so readers never see half an entry.
+        handle = open(name + '.tmp', 'wb')
+        handle.write(zlib.compress(cPickle.dumps(entry, cPickle.HIGHEST_PROTOCOL)))
+        handle.close()
+        os.rename(name + '.tmp', name)
+        
+        self.evict()
@@ -5,7 +5,11 @@
 @license MIT
 """
 from exception import BridgeCutException
-from lib.util import combinations, product
+from graph.hops import Hops
+from graph.reduction import Reduction
+from lib.util import combinations
+
+import time
 
 class BridgeCut(object):
     
@@ -18,13 +22,97 @@ class BridgeCut(object):
                 }
        
     @classmethod
-    def davies_bouldin(cls, graph, clusters):
+    def cluster_dists(cls, graph, clusters, sample=0):
+        """
+        Returns the sum of the distances from every node to every cluster.
+        
+        The sums are keyed by node value and then by cluster, so the
+        cluster level metrics can be aggregated without enumerating
+        every pair of nodes more than once.  Distances are symmetric, so
+        the nodes of the clusters are the sources of a bit parallel BFS
+        (see Hops) and every level adds its hops once for each source of
+        a cluster reaching a node.  The clusters' nodes are searched in
+        cluster order, so each cluster is a run of bits.
+        
+        With a sample, only that many nodes of each cluster, spread
+        evenly over it, get their sums.
+        
+        Key arguments:
+        graph    -- the original graph
+        clusters -- the clusters to analyze
+        sample   -- most nodes of each cluster to sum for, 0 for all. [optional]
+        """
+        nodes = graph.nodes
+        if sample:
+            nodes = []
+            for cluster in clusters:
+                for node in cls.spread(cluster, sample):
+                    if graph.node(node.value):
+                        nodes.append(graph.node(node.value))
+        
+        hops = Hops(graph)
+        
+        rows = {}
+        reached = {}
+        for node in nodes:
+            rows[hops.index[node]] = dict([(cluster, 0) for cluster in clusters])
+            reached[hops.index[node]] = dict([(cluster, 0) for cluster in clusters])
+        
+        # The bits each cluster takes, nodes outside the graph are never reached.
+        sources = []
+        spans = []
+        for cluster in clusters:
+            start = len(sources)
+            for onode in cluster.nodes:
+                if graph.node(onode.value):
+                    sources.append(graph.node(onode.value))
+            spans.append((cluster, start, len(sources)))
+        
+        start = 0
+        for batch in hops.batches(sources):
+            end = start + len(batch)
+            
+            masks = []
+            for cluster, lo, hi in spans:
+                lo = max(lo, start)
+                hi = min(hi, end)
+                if lo < hi:
+                    masks.append((cluster, ((1 << (hi - lo)) - 1) << (lo - start)))
+            
+            for dist, frontier in hops.levels(batch):
+                for i, bits in frontier.iteritems():
+                    if not i in rows:
+                        continue
+                    for cluster, mask in masks:
+                        n = Hops.count(bits & mask)
+                        if n:
+                            rows[i][cluster] += dist * n
+                            reached[i][cluster] += n
+            
+            start = end
+        
+        dists = {}
+        for node in nodes:
+            i = hops.index[node]
+            dists[node.value] = row = {}
+            for cluster in clusters:
+                # Any node of the cluster out of reach is infinitely far.
+                if reached[i][cluster] < len(cluster.nodes):
+                    row[cluster] = float('inf')
+                else:
+                    row[cluster] = float(rows[i][cluster])
+        
+        return dists
+    
+    @classmethod
+    def davies_bouldin(cls, graph, clusters, sample=0):
         """
         Return the davies bouldin index for the clusters.
         
         Key arguments:
         graph    -- the original graph
         clusters -- the clusters to analyze
+        sample   -- most nodes of each cluster measured from, 0 for all. [optional]
         """
         # If we only have one cluster, then return inf!
         if len(clusters) < 2:
@@ -45,29 +133,31 @@ class BridgeCut(object):
         for cluster in clusters:
             diams[cluster] = 0.0
             if len(cluster.nodes) > 1:
-                paths = cluster.paths()
-                for node1, node2 in combinations(cluster.nodes, 2):
-                    diams[cluster] = max(diams[cluster], cluster.dist(node1, node2, paths))
-                  
-                # If it weren't for directed graphs, we could use the combinations method.
-                for node1 in paths:
-                    for node2 in paths[node1]:
-                        if node1 != node2 and paths[node1][node2]:
-                            diams[cluster] = max(diams[cluster], cluster.dist(node1, node2, paths))
-        
-        # Find all the graphs paths.
-        paths = graph.paths()
+                hops = Hops(cluster)
+                for batch in hops.batches(cls.spread(cluster, sample)):
+                    n = 0
+                    for dist, frontier in hops.levels(batch):
+                        diams[cluster] = max(diams[cluster], float(dist))
+                        for bits in frontier.itervalues():
+                            n += Hops.count(bits)
+                    
+                    if n < len(batch) * len(cluster.nodes):
+                        diams[cluster] = float('inf')
+        
+        # Sum the distances from every node to every cluster once.
+        sums = cls.cluster_dists(graph, clusters, sample)
         
         # Calculate the distances between each cluster.
         dists = {}
+        for cluster1 in clusters:
+            dists[cluster1] = {}
         for cluster1, cluster2 in combinations(clusters, 2):
-            if not cluster1 in dists:
-                dists[cluster1] = {}
-            if not cluster2 in dists:
-                dists[cluster2] = {}
-                
-            # Find the average cluster distance between cluster i and j.
-            dist = sum([graph.dist(node1, node2, paths) for node1, node2 in product(cluster1.nodes, cluster2.nodes)]) / float(len(cluster1.nodes) * len(cluster2.nodes))
+            # Find the average cluster distance between cluster i and j,
+            #  from both sides so a sample doesn't depend on their order.
+            rows1 = [sums[node.value] for node in cluster1.nodes if node.value in sums]
+            rows2 = [sums[node.value] for node in cluster2.nodes if node.value in sums]
+            dist = (sum([row[cluster2] for row in rows1]) + sum([row[cluster1] for row in rows2])) / \
+                   float(len(rows1) * len(cluster2.nodes) + len(rows2) * len(cluster1.nodes))
             dists[cluster1][cluster2] = dist
             dists[cluster2][cluster1] = dist
         
@@ -82,92 +172,216 @@ class BridgeCut(object):
         return num / len(clusters)
     
     @classmethod
-    def factory(cls, v, graph):
+    def factory(cls, v, graph, engine=None):
         """
         Returns a specific version of the Bridge Cut algorithm.
         
         Key arguments:
-        v     -- the version
-        graph -- the inital graph.
+        v      -- the version
+        graph  -- the inital graph.
+        engine -- finds the shortest paths, Graph.PATHS by default. [optional]
         """
         if v in cls.VERSIONS:
-            obj = None
-            exec('import ' + '.'.join(cls.VERSIONS[v][0]))
-            exec('obj = ' + '.'.join(cls.VERSIONS[v][0]) + '.' + cls.VERSIONS[v][1] + '(graph)')
-            return obj
+            module = __import__('.'.join(cls.VERSIONS[v][0]), globals(), {}, [cls.VERSIONS[v][1]])
+            return getattr(module, cls.VERSIONS[v][1])(graph, engine)
         
         raise BridgeCutException('Version Not Implemented.')
     
     @classmethod
-    def silhouette(cls, graph, clusters):
+    def refine(cls, graph, clusters, t, passes=2):
         """
-        Find the average silhouette distance for the clusters.
+        Moves boundary nodes to the neighboring cluster they have the most
+        edges to.
+        
+        A move is only made when both clusters stay denser than the
+        threshold.  Clusters broken apart by the moves are split into
+        their components.
+        
+        Key arguments:
+        graph    -- the graph the clusters are made of.
+        clusters -- the clusters to refine.
+        t        -- density threshold
+        passes   -- the most passes over the nodes. [optional]
         """
-        paths = graph.paths()
+        owners = {}
+        for i in range(len(clusters)):
+            for node in clusters[i].nodes:
+                owners[node.value] = i
         
-        # Calculate the distances for all pairs of nodes.
-        dists = {}
-        for node1, node2 in combinations(graph.nodes, 2):
-            value1 = node1.value
-            value2 = node2.value
-            dist = graph.dist(node1, node2, paths)
+        # Nodes and twice the edges of each cluster, in original counts.
+        n = [0] * len(clusters)
+        e = [0] * len(clusters)
+        for node in graph.nodes:
+            i = owners.get(node.value)
+            if i == None:
+                continue
+            n[i] += node.weight
+            e[i] += 2 * node.internal
+            for edge in node.edges:
+                if owners.get(edge.node(node).value) == i:
+                    e[i] += edge.weight
+        
+        for _ in range(passes):
+            moved = False
+            for node in graph.nodes:
+                a = owners.get(node.value)
+                if a == None:
+                    continue
+                
+                links = {}
+                for edge in node.edges:
+                    b = owners.get(edge.node(node).value)
+                    if b != None:
+                        links[b] = links.get(b, 0) + edge.weight
                 
-            if not value1 in dists:
-                dists[value1] = {}
-            if not value2 in dists:
-                dists[value2] = {}
+                b = a
+                for i in sorted(links):
+                    if links[i] > links.get(b, 0):
+                        b = i
                 
-            dists[value1][value2] = dist
-            dists[value2][value1] = dist
+                if b == a:
+                    continue
+                
+                # Sizes of both clusters after the move.
+                na = n[a] - node.weight
+                ea = e[a] - 2 * (node.internal + links.get(a, 0))
+                nb = n[b] + node.weight
+                eb = e[b] + 2 * (node.internal + links[b])
+                
+                if (na < 2 or float(ea) / (na * (na - 1)) > t) and \
+                   (nb < 2 or float(eb) / (nb * (nb - 1)) > t):
+                    owners[node.value] = b
+                    n[a], e[a], n[b], e[b] = na, ea, nb, eb
+                    moved = True
+            
+            if not moved:
+                break
+        
+        members = [[] for cluster in clusters]
+        for node in graph.nodes:
+            if node.value in owners:
+                members[owners[node.value]].append(node.value)
+        
+        ret = []
+        for values in members:
+            if values:
+                ret.extend(graph.subgraph(values).components())
+        
+        return ret
+    
+    @classmethod
+    def silhouette(cls, graph, clusters, sample=0):
+        """
+        Find the average silhouette distance for the clusters.
+        
+        Key arguments:
+        graph    -- the original graph
+        clusters -- the clusters to analyze
+        sample   -- most nodes of each cluster averaged over, 0 for all. [optional]
+        """
+        sums = cls.cluster_dists(graph, clusters, sample)
         
         s = 0.0
         for node in graph.nodes:
+            if not node.value in sums:
+                continue
+            
             # Find a and b.
             a = 0.0
             b = float('inf')
             for cluster in clusters:
                 if cluster.node(node.value):
                     if len(cluster.nodes) > 1:
-                        a = sum([dists[node.value][onode.value] for onode in cluster.nodes if node.value != onode.value]) / float(len(cluster.nodes) - 1)
+                        a = sums[node.value][cluster] / float(len(cluster.nodes) - 1)
                     else:
                         a = 0.0
                 else:
-                    b = min(b, sum([dists[node.value][onode.value] for onode in cluster.nodes]) / float(len(cluster.nodes)))
+                    b = min(b, sums[node.value][cluster] / float(len(cluster.nodes)))
             
             if b == float('inf'):
                 b = 0.0
             
+            # A node alone in its cluster with nothing else in reach, as a
+            #  lone seed can be, counts as neither well nor badly placed.
+            if max(a, b) == 0:
+                continue
+            
             s += (b - a) / max(a, b)
         
-        return s / len(graph.nodes)
+        if not sums:
+            return 0.0
         
-    def __init__(self, graph):
+        return s / len(sums)
+    
+    @classmethod
+    def spread(cls, graph, sample=0):
+        """
+        Returns nodes spread evenly over a graph.
+        
+        Key arguments:
+        graph  -- the graph.
+        sample -- most nodes returned, 0 for all. [optional]
+        """
+        if not sample or sample >= len(graph.nodes):
+            return graph.nodes
+        
+        step = -(-len(graph.nodes) // sample)
+        return graph.nodes[::step]
+        
+    def __init__(self, graph, engine=None):
         """
         Init.
         
         Key arguments:
-        graph -- the graph.
+        graph  -- the graph.
+        engine -- finds the shortest paths, Graph.PATHS by default. [optional]
         """
         self.graph = graph
+        self.engine = engine
     
-    def execute(self, t):
+    def execute(self, t, early=False, size=1, cuts=0, secs=0, callback=None, tree=None):
         """
         Cluster the graph based on bridges.
         
+        In early termination mode, after every cut the components that are
+        small enough or already dense enough are accepted right away instead
+        of being ranked again.  Once the cut or time cap is reached, every
+        remaining component is accepted as is.
+        
+        Given a dendrogram, every cut and the pieces it leaves are recorded
+        in it, so the clusters of any lower threshold can be looked up.
+        
         Key arguments:
-        t -- density threshold
+        t        -- density threshold
+        early    -- early termination mode. [optional]
+        size     -- largest component accepted without cutting in early termination mode. [optional]
+        cuts     -- maximum number of cuts, 0 for no limit. [optional]
+        secs     -- maximum seconds spent cutting, 0 for no limit. [optional]
+        callback -- called with each iteration's result and the nodes left. [optional]
+        tree     -- the dendrogram to record the cuts in. [optional]
         """
         # Deep copy the graph for multiple execution.
         graph = self.graph.copy()
         
+        # The components are cut before they are ever measured.
+        if tree:
+            for component in graph.components():
+                tree.add(None, component.values)
+        
         clusters = []
         results = []
         
+        start = time.time()
         while graph.nodes:
-            size = len(graph.nodes)
+            # Reduced nodes count as the original nodes they stand for.
+            n = sum([node.weight for node in graph.nodes])
             # Get the nodes after a split occurred.
             top, score, nodes = self.split(graph)
             
+            if tree and nodes:
+                piece = tree.owners[nodes[0].value]
+                tree.cut(piece, top, score)
+            
             # There was nothing to be split,
             #  remove the node that tried to destroy.
             if not nodes:
@@ -180,14 +394,138 @@ class BridgeCut(object):
                 # Expand this node.
                 cluster = graph.__class__.expand(node)
                 
-                nodes = list(set(nodes).difference(cluster.nodes))
+                # Keep the neighbors in order, so the clusters come out in
+                #  the same order whatever graph holds the nodes.
+                members = set(cluster.nodes)
+                nodes = [other for other in nodes if not other in members]
                 
-                if cluster.density() > t:
+                density = cluster.density()
+                if tree:
+                    tree.add(piece, cluster.values, density)
+                
+                if density > t:
                     clusters.append(cluster)
                     graph.remove(cluster)
             
+            # Have we hit one of the caps?
+            done = (cuts and len(results) + 1 >= cuts) or \
+                   (secs and time.time() - start >= secs)
+            
+            # Accept what is left without ranking it again.
+            if early or done:
+                for cluster in graph.components():
+                    if done or len(cluster.nodes) <= size or cluster.density() > t:
+                        clusters.append(cluster)
+                        graph.remove(cluster)
+            
             # Append the top edge/vertex, score, nodes removed, and graph clustering coefficient.
-            results.append((top, score, (size - len(graph.nodes)), graph.cluster_coeff()))
+            results.append((top, score, (n - sum([node.weight for node in graph.nodes])), graph.cluster_coeff()))
+            
+            # Report progress, the callback may stop us by raising.
+            if callback:
+                callback(results[-1], len(graph.nodes))
+        
+        return results, clusters
+    
+    def local(self, values, k, t, halo=2, everything=False, **options):
+        """
+        Cluster only the neighborhood of some seed nodes.
+        
+        The version runs on the nodes within k hops of any seed, plus a
+        halo of extra hops so that routes near the edge of the
+        neighborhood still pass through the nodes they would in the whole
+        graph.  The wider the halo, the closer the betweenness is to the
+        whole graph's, see golden.py.  Only the clusters holding a seed
+        are returned, unless asked for every cluster of the neighborhood.
+        
+        Key arguments:
+        values     -- values of the seed nodes.
+        k          -- hops around the seeds.
+        t          -- density threshold
+        halo       -- extra hops kept to soften the boundary. [optional]
+        everything -- return every cluster of the neighborhood. [optional]
+        options    -- the other arguments of execute. [optional]
+        """
+        if not values:
+            raise BridgeCutException('No Seeds.')
+        
+        members = {}
+        for value in values:
+            node = self.graph.node(value)
+            if not node:
+                raise BridgeCutException('Node Not Found.')
+            members.update(self.graph.__class__.expand(node, k + halo).values)
+        
+        results, clusters = self.__class__(self.graph.subgraph(members), self.engine).execute(t, **options)
+        
+        if everything:
+            return results, clusters
+        
+        ret = []
+        for cluster in clusters:
+            for value in values:
+                if cluster.node(value):
+                    ret.append(cluster)
+                    break
+        
+        return results, ret
+    
+    def multilevel(self, t, coarse=100, passes=2, check=False, **options):
+        """
+        Cluster a coarsened graph and carry the clusters back.
+        
+        The graph is coarsened by heavy edge matching until it has no more
+        than coarse nodes or stops shrinking, the version runs on the
+        coarsest graph, and its clusters are projected back one level at a
+        time, refining their boundaries on every level.  Clusters that
+        turn out no denser than the threshold on a level are cut again
+        there, on their own.  With check, a level's refinement is only
+        kept if it doesn't make both the silhouette and the DB index
+        worse, which measures both on every level; sparse clusters are
+        cut again either way.
+        
+        Key arguments:
+        t       -- density threshold
+        coarse  -- the most nodes of the coarsest graph. [optional]
+        passes  -- the most refinement passes on each level. [optional]
+        check   -- judge each refinement by the silhouette and DB index. [optional]
+        options -- the other arguments of execute. [optional]
+        """
+        reductions = []
+        
+        graph = self.graph
+        while len(graph.nodes) > coarse:
+            reduction = Reduction(graph, trees=False, chains=False, match=True)
+            
+            # Matching stalls on stars and the like, stop coarsening there.
+            if len(reduction.graph.nodes) > 0.9 * len(graph.nodes):
+                break
+            
+            reductions.append(reduction)
+            graph = reduction.graph
+        
+        results, clusters = self.__class__(graph, self.engine).execute(t, **options)
+        
+        for reduction in reversed(reductions):
+            graph = reduction.original
+            clusters = reduction.expand(clusters)
+            refined = self.refine(graph, clusters, t, passes)
+            
+            # The check only chooses between the refined and unrefined clusters.
+            if not check or self.silhouette(graph, refined) >= self.silhouette(graph, clusters) or \
+               self.davies_bouldin(graph, refined) <= self.davies_bouldin(graph, clusters):
+                clusters = refined
+            
+            # Folded nodes may have hidden sparse clusters, cut them again here.
+            ret = []
+            for cluster in clusters:
+                if len(cluster.nodes) > 1 and cluster.density() <= t:
+                    more, parts = self.__class__(cluster, self.engine).execute(t, **options)
+                    results.extend(more)
+                    ret.extend(parts)
+                else:
+                    ret.append(cluster)
+            clusters = ret
         
         return results, clusters
     
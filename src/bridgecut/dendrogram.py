@@ -0,0 +1,235 @@
+"""
+Hierarchy of the cuts of a run.
+
+@package bridgecut
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+from exception import BridgeCutException
+from graph.edge import Edge
+from record import Record
+
+class Dendrogram(object):
+    
+    @classmethod
+    def load(cls, name):
+        """
+        Reads a dendrogram written by save.
+        
+        Key arguments:
+        name -- the record file.
+        """
+        record = Record(name)
+        try:
+            tree = cls(record.value('threshold'))
+            
+            tree.parents = list(record.column('parent'))
+            
+            # Nothing is stored as NaN.
+            for density in record.column('density'):
+                if density != density:
+                    density = None
+                tree.densities.append(density)
+            
+            for score in record.column('score'):
+                if score != score:
+                    score = None
+                tree.scores.append(score)
+            
+            tree.items = [item or None for item in record.column('item')]
+            for value1, value2 in zip(record.column('end1'), record.column('end2')):
+                tree.ends.append(value1 and (value1, value2) or None)
+            tree.owners = dict(zip(record.column('node'), record.column('owner')))
+        finally:
+            record.close()
+        
+        return tree
+    
+    def __init__(self, t):
+        """
+        Init.
+        
+        Every component a cut leaves behind is a piece, the child of the
+        piece that was cut, with its density.  A run only accepts a piece
+        denser than its threshold, so the pieces it keeps cutting are the
+        same at any lower threshold, and the clusters for any of them are
+        the first pieces down the tree that are denser than it.  The
+        components of the graph are the roots, they are always cut first.
+        
+        With betweenness the cut of a piece only depends on the piece, so
+        the clusters are the ones a run would find.  Bridging centrality
+        ranks against everything left in the graph, which differs from one
+        threshold to the next, so for those versions the clusters are
+        those of the recorded cut sequence.  Pieces accepted by early
+        termination or a cap are never cut.
+        
+        Key arguments:
+        t -- the density threshold of the run, the highest one answered.
+        """
+        self.t = t
+        
+        # Parent, density and cut of each piece, roots are their own parent.
+        self.parents = []
+        self.densities = []
+        self.items = []
+        self.scores = []
+        
+        # Node values of each cut edge, the pieces below have lost it.
+        self.ends = []
+        
+        # The smallest piece holding each node value.
+        self.owners = {}
+    
+    def add(self, parent, values, density=None):
+        """
+        Adds a piece, returns its number.
+        
+        Key arguments:
+        parent  -- the piece it was cut from, None for a root.
+        values  -- values of its nodes.
+        density -- its density, None for a root. [optional]
+        """
+        piece = len(self.parents)
+        if parent == None:
+            parent = piece
+        
+        self.parents.append(parent)
+        self.densities.append(density)
+        self.items.append(None)
+        self.scores.append(None)
+        self.ends.append(None)
+        
+        for value in values:
+            self.owners[value] = piece
+        
+        return piece
+    
+    def clusters(self, t):
+        """
+        Returns the node values of each cluster for a density threshold.
+        
+        Key arguments:
+        t -- density threshold, no higher than the recorded one.
+        """
+        return sorted([values for values, _ in self.walk(t)])
+    
+    def cut(self, piece, item, score):
+        """
+        Records the cut of a piece.
+        
+        Key arguments:
+        piece -- number of the piece.
+        item  -- the edge or vertex removed.
+        score -- its score.
+        """
+        self.items[piece] = str(item)
+        self.scores[piece] = score
+        
+        # A removed vertex is a piece of its own, so only edges matter.
+        if isinstance(item, Edge):
+            self.ends[piece] = (item.node1.value, item.node2.value)
+    
+    def expand(self, members):
+        """
+        Replaces the values of a reduced graph by the ones they stand for.
+        
+        The cut edges were between reduced nodes, so they are dropped.
+        
+        Key arguments:
+        members -- the original values of each reduced value.
+        """
+        owners = {}
+        for value, piece in self.owners.iteritems():
+            for member in members[value]:
+                owners[member] = piece
+        
+        self.owners = owners
+        self.ends = [None for _ in self.ends]
+    
+    def save(self, name, v='', source=''):
+        """
+        Writes the dendrogram as a record.
+        
+        Key arguments:
+        name   -- the record file.
+        v      -- the version. [optional]
+        source -- the edge list file. [optional]
+        """
+        nodes = sorted(self.owners)
+        
+        Record.write(name, [
+                            ('parent', 'I', self.parents),
+                            ('density', 'd', [density == None and float('nan') or density for density in self.densities]),
+                            ('item', 's', [item or '' for item in self.items]),
+                            ('end1', 's', [ends and ends[0] or '' for ends in self.ends]),
+                            ('end2', 's', [ends and ends[1] or '' for ends in self.ends]),
+                            ('score', 'd', [score == None and float('nan') or float(score) for score in self.scores]),
+                            ('node', 's', nodes),
+                            ('owner', 'I', [self.owners[value] for value in nodes]),
+                            ('threshold', 'd', [float(self.t)]),
+                            ('version', 's', [v]),
+                            ('source', 's', [source]),
+                            ])
+    
+    def subgraphs(self, graph, t):
+        """
+        Returns the clusters for a density threshold as graphs.
+        
+        Like the clusters of a run, they lack the edges cut above them.
+        
+        Key arguments:
+        graph -- the graph the run was made on.
+        t     -- density threshold, no higher than the recorded one.
+        """
+        ret = []
+        for values, ends in sorted(self.walk(t)):
+            cluster = graph.subgraph(values)
+            for value1, value2 in ends:
+                cluster.unlink(value1, value2)
+            ret.append(cluster)
+        
+        return ret
+    
+    def walk(self, t):
+        """
+        Yields the node values of each cluster for a density threshold,
+        and the edges cut above it.
+        
+        Key arguments:
+        t -- density threshold, no higher than the recorded one.
+        """
+        if t > self.t:
+            raise BridgeCutException('Threshold above the recorded one.')
+        
+        children = [[] for _ in self.parents]
+        for piece in range(len(self.parents)):
+            if self.parents[piece] != piece:
+                children[self.parents[piece]].append(piece)
+        
+        members = [[] for _ in self.parents]
+        for value, piece in self.owners.iteritems():
+            members[piece].append(value)
+        
+        for root in range(len(self.parents)):
+            if self.parents[root] != root:
+                continue
+            
+            q = [(root, [])]
+            while q:
+                piece, ends = q.pop()
+                density = self.densities[piece]
+                if not children[piece] or (density != None and density > t):
+                    # Gather the values of the whole subtree.
+                    values = []
+                    subtree = [piece]
+                    while subtree:
+                        node = subtree.pop()
+                        values.extend(members[node])
+                        subtree.extend(children[node])
+                    yield sorted(values), ends
+                else:
+                    if self.ends[piece]:
+                        ends = ends + [self.ends[piece]]
+                    for child in children[piece]:
+                        q.append((child, ends))
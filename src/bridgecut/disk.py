@@ -0,0 +1,144 @@
+"""
+Bridge Cut of a graph on disk.
+
+@package bridgecut
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+from core import BridgeCut
+from exception import BridgeCutException
+
+from array import array
+from bisect import bisect_left
+
+class DiskBridgeCut(BridgeCut):
+    
+    @classmethod
+    def levels(cls, scores):
+        """
+        Returns the distinct scores in order, a score's rank is one past
+        its position, exactly as ranks gives it.
+        
+        Key arguments:
+        scores -- the scores.
+        """
+        return sorted(set(scores))
+    
+    def __init__(self, graph, v):
+        """
+        Init.
+        
+        Every version is scored from arrays kept by node id and by slot
+        rather than from the nodes and edges of a graph in memory, with
+        the same sums in the same order, so the cuts are the same.
+        
+        Key arguments:
+        graph -- the graph, see DiskGraph.
+        v     -- the version.
+        """
+        if not v in self.VERSIONS:
+            raise BridgeCutException('Version Not Implemented.')
+        
+        BridgeCut.__init__(self, graph)
+        
+        self.v = v
+    
+    def coeffs(self, graph, commons):
+        """
+        Returns the bridging coefficient of every node by id.
+        
+        Key arguments:
+        graph   -- the graph.
+        commons -- common neighbors of every edge by slot.
+        """
+        store = graph.store()
+        
+        ret = array('d', [0.0]) * store.n
+        for node in graph.nodes:
+            if node.deg() == 0:
+                continue
+            
+            num = 0.0
+            for slot, nbr in store.slots(node.id):
+                n = store.degs[nbr]
+                if n == 1:
+                    continue
+                
+                num += (n - 1 - commons[slot]) / float(n - 1)
+            
+            ret[node.id] = num / float(node.deg())
+        
+        return ret
+    
+    def split(self, graph):
+        """
+        @see parent
+        """
+        store = graph.store()
+        node_btwns, edge_btwns = graph.btwns()
+        
+        if self.v.endswith('-c'):
+            commons = graph.commons()
+            coeffs = self.coeffs(graph, commons)
+        
+        if self.v.startswith('vertex'):
+            btwns = self.levels([node_btwns[node.id] for node in graph.nodes])
+            if self.v == 'vertex-c':
+                bridges = self.levels([coeffs[node.id] for node in graph.nodes])
+            
+            max_score = 0.0
+            max_node = None
+            
+            # Find the vertex with the best score.
+            for node in graph.nodes:
+                score = bisect_left(btwns, node_btwns[node.id]) + 1
+                if self.v == 'vertex-c':
+                    score *= bisect_left(bridges, coeffs[node.id]) + 1
+                
+                if score > max_score:
+                    max_score = score
+                    max_node = node
+            
+            # Find the nodes that were broken off.
+            nodes = max_node.destroy()
+            if nodes:
+                nodes.append(max_node)
+            
+            return max_node, max_score, nodes
+        
+        def bridge_coeff(slot, node1, node2):
+            num = node1.deg() * coeffs[node1.id] + \
+                  node2.deg() * coeffs[node2.id]
+            
+            den = (node1.deg() + node2.deg()) * \
+                  (commons[slot] + 1)
+            
+            return num / float(den)
+        
+        btwns = self.levels([edge_btwns[slot] for slot, _, _ in graph.edges()])
+        if self.v == 'edge-c':
+            bridges = self.levels([bridge_coeff(*edge) for edge in graph.edges()])
+        
+        max_score = 0.0
+        max_edge = None
+        
+        # Find the edge with the best score.
+        for edge in graph.edges():
+            score = bisect_left(btwns, edge_btwns[edge[0]]) + 1
+            if self.v == 'edge-c':
+                score *= bisect_left(bridges, bridge_coeff(*edge)) + 1
+            
+            if score > max_score:
+                max_score = score
+                max_edge = edge
+        
+        # No edges left, remove a node on its own.
+        if not max_edge:
+            return graph.nodes[0], None, []
+        
+        # An edge on disk is only a slot, its string stands for it.
+        slot, node1, node2 = max_edge
+        store.destroy(slot)
+        
+        return str(node1) + ' <-> ' + str(node2), max_score, [node1, node2]
@@ -0,0 +1,77 @@
+"""
+Adjacency view of a graph.
+
+@package bridgecut
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+class Adjacency(object):
+    
+    def __init__(self, nodes):
+        """
+        Init.
+        
+        Builds the neighbor set of every node once, so edge counts and
+        common neighbors are answered with set operations in bulk rather
+        than by rebuilding neighbor lists for every query.
+        
+        Key arguments:
+        nodes -- the nodes to view.
+        """
+        self.nodes = nodes
+        
+        self.nbrs = {}
+        
+        # Edges standing for more than one original edge, seen from each end.
+        self.heavy = []
+        
+        for node in nodes:
+            nbrs = self.nbrs[node] = set()
+            for edge in node.edges:
+                nbrs.add(edge.node(node))
+                if edge.weight != 1:
+                    self.heavy.append(edge)
+        
+        # Common neighbor counts, keyed by edge.
+        self.commons = {}
+    
+    def common(self, edge):
+        """
+        Returns the number of neighbors common to both nodes of an edge.
+        
+        Key arguments:
+        edge -- the edge.
+        """
+        try:
+            return self.commons[edge]
+        except KeyError:
+            ret = self.commons[edge] = len(self.nbrs[edge.node1].intersection(self.nbrs[edge.node2]))
+            return ret
+    
+    def edges(self):
+        """
+        Returns the number of edges between the viewed nodes.
+        
+        Edges of a reduced graph count as the original edges they stand for.
+        """
+        members = set(self.nbrs)
+        
+        ret = 0
+        for node in self.nodes:
+            ret += len(self.nbrs[node].intersection(members))
+        
+        for edge in self.heavy:
+            if edge.node1 in members and edge.node2 in members:
+                ret += edge.weight - 1
+        
+        return ret // 2
+    
+    def triangles(self, node):
+        """
+        Returns the number of edges running between a node's neighbors.
+        
+        Key arguments:
+        node -- the node.
+        """
+        return sum([self.common(edge) for edge in node.edges]) // 2
@@ -6,30 +6,39 @@ Graph core.
 @copyright 2011 Aaron Zampaglione
 @license MIT
 """
+from adjacency import Adjacency
 from node import Node
 from edge import Edge
+from paths import Paths
 
-from bridgecut.lib.util import combinations
+from collections import deque
 
 class Graph(object):
     
+    # Default engine finding the shortest paths and betweenness, see golden.py.
+    PATHS = Paths
+    
     @classmethod
-    def expand(cls, node):
+    def expand(cls, node, depth=None):
         """
         Builds a graph based on a single node by expanding.
         
         Key arguments:
         node  -- the node to expand.
+        depth -- the furthest hops to expand. [optional]
         """
-        visited = {}
+        visited = {node.value: node}
         
-        q = [node]
+        q = deque([(node, 0)])
         while q:
-            node = q.pop(0)
-            visited[node.value] = node
+            node, dist = q.popleft()
+            if depth != None and dist >= depth:
+                continue
+            
             for nbr in node.nbrs():
                 if not nbr.value in visited:
-                    q.append(nbr)
+                    visited[nbr.value] = nbr
+                    q.append((nbr, dist + 1))
         
         return cls(visited)
     
@@ -90,57 +99,49 @@ class Graph(object):
         """
         return ', '.join([str(node) for node in self.nodes])
     
-    def bfs(self, src, paths):
+    def adjacency(self):
+        """
+        Returns the adjacency view of this graph.
+        """
+        return Adjacency(self.nodes)
+    
+    def bfs(self, src):
         """
         BFS for all the shortest paths from a source node.
         
-        Optimized this method as best as possible...
+        Returns the visiting order, the hops to each node, the edge each
+        node was discovered through and each node's predecessors.
         
         Key arguments:
         src   -- source node
-        paths -- already determined paths
         """
-        newpaths = {}
-        newpaths[src] = {}
-        
-        # All paths are guaranteed, so prebuild an empty dictionary.
-        for node in self.nodes:
-            if src != node:
-                newpaths[src][node] = None
-        
-        # Keep track of nodes we have visited already.
-        visited = {}
-        visited[src] = True
+        order = [src]
+        dists = {src: 0}
+        parents = {src: None}
+        preds = {src: []}
         
         # BFS
-        q = [(src, [])]
+        q = deque([src])
         while q:
-            node, path = q.pop(0)
-                    
-            for nbr in node.nbrs():
-                if not nbr in paths and nbr != src:
-                    if newpaths[src][nbr] != None:
-                        l1 = len(path)
-                        l2 = len(newpaths[src][nbr][0])                    
-                        # New shortest path!
-                        if l1 < l2:
-                            newpaths[src][nbr] = [list(path)]
-                        # Add another shortest path.
-                        elif l1 == l2:
-                            newpaths[src][nbr].append(list(path))
-                    else:
-                        newpaths[src][nbr] = [list(path)]
+            node = q.popleft()
+            dist = dists[node] + 1
+            
+            for edge in node.edges:
+                nbr = edge.node(node)
                 
-                # Have we found paths to every node in the graph yet?
-                if not nbr in visited:
-                    visited[nbr] = True
-                    # Add node to the new path.
-                    newpath = list(path)
-                    newpath.append(nbr)
-                    # Add  to queue.
-                    q.append((nbr, newpath))
-        
-        return newpaths
+                # First time we see this node, the edge is its parent.
+                if not nbr in dists:
+                    order.append(nbr)
+                    dists[nbr] = dist
+                    parents[nbr] = edge
+                    preds[nbr] = []
+                    q.append(nbr)
+                
+                # Another route of the same length.
+                if dists[nbr] == dist:
+                    preds[nbr].append(node)
+        
+        return order, dists, parents, preds
     
     def cluster_coeff(self):
         """
@@ -149,40 +150,56 @@ class Graph(object):
         if len(self.nodes) < 2:
             return 0.0
         
+        adj = self.adjacency()
+        
         num = 0.0
         for node in self.nodes:
             # Special case, node with only one neighbor.
             if node.deg() < 2:
                 continue
             
-            edges = set()
-            for nbr1, nbr2 in combinations(node.nbrs(), 2):
-                edges = edges.union(set(nbr1.edges).intersection(nbr2.edges))
-            num += (2 * len(edges)) / float(node.deg() * (node.deg() - 1))
+            num += (2 * adj.triangles(node)) / float(node.deg() * (node.deg() - 1))
         
         return num / len(self.nodes)
     
-    def copy(self):
+    def components(self):
         """
-        Returns a deep copy of this graph.
+        Returns the connected components of this graph.
         """
-        items = []
+        ret = []
+        
+        visited = {}
         for node in self.nodes:
-            for nbr in node.nbrs():
-                items.append([node.value, nbr.value])
+            if not node.value in visited:
+                component = self.__class__.expand(node)
+                visited.update(component.values)
+                ret.append(component)
         
-        return self.__class__.factory(items)
+        return ret
+    
+    def copy(self):
+        """
+        Returns a deep copy of this graph.
+        """
+        return self.subgraph(self.values)
         
     def density(self):
         """
         Finds the density of this graph.
+        
+        Nodes of a reduced graph count as the original nodes and edges
+        they stand for.
         """
-        n = len(self.nodes)
+        n = 0
+        e = self.adjacency().edges()
+        for node in self.nodes:
+            n += node.weight
+            e += node.internal
         
         if (n - 1) == 0:
             return float('inf')
             
-        return float(2 * len(self.edges())) / (n * (n - 1))
+        return float(2 * e) / (n * (n - 1))
     
     def dist(self, node1, node2, paths=None):
         """
@@ -203,20 +220,67 @@ class Graph(object):
         if not node1 or not node2:
             return float('inf')
         
-        # We need to add one because the initial and final nodes of the route
-        #  are not included in the actual route!
-        return len(paths[node1][node2][0]) + 1.0
+        dist = paths.dist(node1, node2)
+        if dist == None:
+            return float('inf')
+        
+        return float(dist)
     
     def edges(self):
         """
         Returns the edges in the graph.
         """
-        ret = set(self.nodes[0].edges)
-        for node in self.nodes[1:]:
-            ret = ret.union(node.edges)
+        ret = []
+        
+        # Keep node order so ties are broken the same way on every run.
+        visited = set()
+        for node in self.nodes:
+            for edge in node.edges:
+                if not edge in visited:
+                    visited.add(edge)
+                    ret.append(edge)
+        
+        return ret
+        
+    def link(self, value1, value2):
+        """
+        Adds an edge to this graph, and its nodes if they are new.
+        
+        Returns the new edge, or None for a self loop or an edge that is
+        already there.
+        
+        Key arguments:
+        value1 -- value of node1.
+        value2 -- value of node2.
+        """
+        if value1 == value2:
+            return None
         
-        return list(ret)
+        nodes = []
+        for value in (value1, value2):
+            node = self.node(value)
+            if not node:
+                node = self.values[value] = Node(value)
+                
+                # Keep node order.
+                lo = 0
+                hi = len(self.nodes)
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if self.nodes[mid].value < value:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+                self.nodes.insert(lo, node)
+            nodes.append(node)
         
+        node1, node2 = nodes
+        for edge in node1.edges:
+            if edge.node(node1) == node2:
+                return None
+        
+        return Edge(node1, node2)
+    
     def node(self, value):
         """
         Returns the node based on a given value.
@@ -229,21 +293,18 @@ class Graph(object):
         except KeyError:
             return None
     
-    def paths(self):
+    def paths(self, engine=None):
         """
         Finds all the shortest paths for every possible route.
-        """
-        paths = self.bfs(self.nodes[0], {})
         
-        for node in self.nodes[1:]:
-            paths.update(self.bfs(node, paths))
+        Key arguments:
+        engine -- finds the shortest paths, PATHS by default. [optional]
+        """
+        paths = (engine or self.PATHS)(list(self.nodes))
         
-        # Build reverse ref.
-        for i in range(len(self.nodes) - 1, 0, -1):
-            for j in range(0, i):
-                node1 = self.nodes[i] 
-                node2 = self.nodes[j]
-                paths[node1][node2] = paths[node2][node1]
+        for node in self.nodes:
+            order, dists, parents, preds = self.bfs(node)
+            paths.add(node, order, dists, parents, preds)
           
         return paths
     
@@ -256,4 +317,77 @@ class Graph(object):
         """
         for node in list(graph.nodes):
             self.nodes.remove(self.node(node.value))
-            del self.values[node.value]
\ No newline at end of file
+            del self.values[node.value]
+    
+    def subgraph(self, values):
+        """
+        Returns a new graph made of some of this graph's nodes and the
+        edges between them.
+        
+        Key arguments:
+        values -- values of the nodes to keep.
+        """
+        members = set(values)
+        
+        items = []
+        heavy = []
+        for node in self.nodes:
+            if node.value in members:
+                for edge in node.edges:
+                    nbr = edge.node(node)
+                    if nbr.value in members:
+                        items.append([node.value, nbr.value])
+                        if edge.weight != 1:
+                            heavy.append((node.value, nbr.value, edge.weight))
+        
+        graph = self.__class__.factory(items)
+        
+        for value1, value2, weight in heavy:
+            node1 = graph.node(value1)
+            for edge in node1.edges:
+                if edge.node(node1).value == value2:
+                    edge.weight = weight
+        
+        # Keep the nodes left without edges, and what reduced nodes stand for.
+        isolated = False
+        for value in members:
+            node = self.node(value)
+            if not node:
+                continue
+            
+            copy = graph.node(value)
+            if not copy:
+                copy = graph.values[value] = Node(value)
+                graph.nodes.append(copy)
+                isolated = True
+            
+            copy.weight = node.weight
+            copy.internal = node.internal
+            copy.folded = node.folded
+            copy.inner = node.inner
+        
+        if isolated:
+            graph.nodes.sort(key=lambda node: node.value)
+        
+        return graph
+    
+    def unlink(self, value1, value2):
+        """
+        Removes an edge from this graph, its nodes stay.
+        
+        Returns whether there was such an edge.
+        
+        Key arguments:
+        value1 -- value of node1.
+        value2 -- value of node2.
+        """
+        node1 = self.node(value1)
+        node2 = self.node(value2)
+        
+        if node1 and node2:
+            for edge in node1.edges:
+                if edge.node(node1) == node2:
+                    edge.destroy()
+                    return True
+        
+        return False
\ No newline at end of file
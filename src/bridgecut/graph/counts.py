@@ -0,0 +1,36 @@
+"""
+Betweenness of a graph, counted source by source.
+
+@package bridgecut
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+from paths import Paths
+
+class Counts(Paths):
+    
+    def __init__(self, nodes):
+        """
+        Init.
+        
+        The betweenness of each source is added as soon as its BFS is, and
+        the BFS is then dropped, so only one tree is ever held instead of
+        one per node.  Distances and routes can't be asked for.
+        
+        Key arguments:
+        nodes -- the graph's nodes, in order.
+        """
+        Paths.__init__(self, nodes)
+        
+        self.node_btwns = {}
+        self.edge_btwns = {}
+        
+        for node in self.nodes:
+            self.node_btwns[node] = node.inner
+    
+    def add(self, src, order, dists, parents, preds):
+        """
+        @see parent
+        """
+        self.accumulate(src, order, parents, preds)
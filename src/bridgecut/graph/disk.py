@@ -0,0 +1,190 @@
+"""
+Graph on disk.
+
+@package bridgecut
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+from core import Graph
+from store import Store
+
+from array import array
+from collections import deque
+
+class DiskGraph(Graph):
+    
+    @classmethod
+    def load(cls, path):
+        """
+        Returns the graph of a store.
+        
+        Key arguments:
+        path -- directory of the store, see Store.factory.
+        """
+        store = Store(path)
+        return cls(dict([(node.value, node) for node in store.nodes]))
+    
+    def btwns(self):
+        """
+        Returns the betweenness of every node by id, and of every edge by
+        its slot in its smaller node's list.
+        
+        The sums are the ones Paths makes, added in the same order, so
+        they equal those of the graph in memory.  Only the BFS tree of the
+        current source is ever held.
+        """
+        store = self.store()
+        
+        node_btwns = array('d', [0.0]) * store.n
+        edge_btwns = array('d', [0.0]) * store.m
+        
+        # Position of each node, used to decide which source owns a pair.
+        index = array('l', [-1]) * store.n
+        for i in range(len(self.nodes)):
+            index[self.nodes[i].id] = i
+        
+        for i in range(len(self.nodes)):
+            src = self.nodes[i].id
+            
+            order = [src]
+            dists = {src: 0}
+            parents = {src: None}
+            preds = {src: []}
+            
+            # BFS, remembering the node and slot each node was found from.
+            q = deque([src])
+            while q:
+                node = q.popleft()
+                dist = dists[node] + 1
+                
+                for slot, nbr in store.slots(node):
+                    if not nbr in dists:
+                        order.append(nbr)
+                        dists[nbr] = dist
+                        parents[nbr] = (node, slot)
+                        preds[nbr] = []
+                        q.append(nbr)
+                    
+                    if dists[nbr] == dist:
+                        preds[nbr].append(node)
+            
+            weights = dict.fromkeys(order, 0.0)
+            
+            # Only targets after the source own the pair.
+            for node in order:
+                if index[node] > i:
+                    share = 1.0 / len(preds[node])
+                    for pred in preds[node]:
+                        weights[pred] += share
+            
+            # Leaves first, so each subtree is complete before its parent.
+            for j in range(len(order) - 1, 0, -1):
+                node = order[j]
+                parent, slot = parents[node]
+                node_btwns[node] += weights[node]
+                if parent != src:
+                    if parent > node:
+                        slot = store.mate(slot)
+                    edge_btwns[slot] += weights[node]
+                weights[parent] += weights[node]
+        
+        return node_btwns, edge_btwns
+    
+    def cluster_coeff(self):
+        """
+        @see parent
+        """
+        if len(self.nodes) < 2:
+            return 0.0
+        
+        store = self.store()
+        commons = self.commons()
+        
+        num = 0.0
+        for node in self.nodes:
+            # Special case, node with only one neighbor.
+            if node.deg() < 2:
+                continue
+            
+            triangles = sum([commons[slot] for slot, _ in store.slots(node.id)]) // 2
+            num += (2 * triangles) / float(node.deg() * (node.deg() - 1))
+        
+        return num / len(self.nodes)
+    
+    def commons(self):
+        """
+        Returns the number of neighbors common to both nodes of every
+        edge, by slot.
+        """
+        store = self.store()
+        
+        ret = array('l', [0]) * store.m
+        for node in self.nodes:
+            slots = store.slots(node.id)
+            nbrs = set([nbr for _, nbr in slots])
+            for slot, nbr in slots:
+                if nbr > node.id:
+                    ret[slot] = ret[store.mate(slot)] = len(nbrs.intersection([other for _, other in store.slots(nbr)]))
+        
+        return ret
+    
+    def copy(self):
+        """
+        Returns a copy of this graph, whose edges are cut apart from this
+        one's while the files are shared.
+        """
+        if not self.nodes:
+            return self.__class__({})
+        
+        store = self.store().copy()
+        
+        # Edges leaving this graph aren't part of the copy.
+        members = set([node.id for node in self.nodes])
+        if len(members) < store.n:
+            for node in self.nodes:
+                for slot, nbr in store.slots(node.id):
+                    if not nbr in members:
+                        store.destroy(slot)
+        
+        return self.__class__(dict([(node.value, store.nodes[node.id]) for node in self.nodes]))
+    
+    def density(self):
+        """
+        @see parent
+        """
+        store = self.store()
+        members = set([node.id for node in self.nodes])
+        
+        n = len(self.nodes)
+        e = 0
+        for node in self.nodes:
+            for _, nbr in store.slots(node.id):
+                if nbr in members:
+                    e += 1
+        e //= 2
+        
+        if (n - 1) == 0:
+            return float('inf')
+        
+        return float(2 * e) / (n * (n - 1))
+    
+    def edges(self):
+        """
+        Yields the slot and nodes of every edge, in the order of the
+        edges of the graph in memory.
+        """
+        for node in self.nodes:
+            store = node.store
+            for slot, nbr in store.slots(node.id):
+                if nbr > node.id:
+                    yield slot, node, store.nodes[nbr]
+    
+    def store(self):
+        """
+        Returns the store this graph's nodes are read from.
+        """
+        if not self.nodes:
+            return None
+        
+        return self.nodes[0].store
@@ -0,0 +1,59 @@
+"""
+Node of a graph on disk.
+
+@package bridgecut
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+class DiskNode(object):
+    
+    # There is one of these for every node of the store, keep them small.
+    __slots__ = ['store', 'id', 'value']
+    
+    # Stored graphs are never reduced, see Node.
+    weight = 1
+    internal = 0
+    
+    def __init__(self, store, id, value):
+        """
+        Init.
+        
+        Key arguments:
+        store -- the store holding this node's edges.
+        id    -- the id of this node.
+        value -- the value of this node.
+        """
+        self.store = store
+        self.id = id
+        self.value = value
+    
+    def __str__(self):
+        """
+        String representation of the node.
+        """
+        return self.value
+    
+    def deg(self):
+        """
+        Returns the degree of this node.
+        """
+        return self.store.degs[self.id]
+    
+    def destroy(self):
+        """
+        Destroy's this node and returns all the direct neighbor nodes.
+        """
+        nbrs = self.nbrs()
+        
+        for slot, _ in self.store.slots(self.id):
+            self.store.destroy(slot)
+        
+        return nbrs
+    
+    def nbrs(self):
+        """
+        Finds this node's neighbors.
+        """
+        nodes = self.store.nodes
+        return [nodes[nbr] for _, nbr in self.store.slots(self.id)]
@@ -6,7 +6,7 @@ Edge of a graph.
 @copyright 2011 Aaron Zampaglione
 @license MIT
 """
-from bridgecut.lib.util import combinations
+from adjacency import Adjacency
 
 class Edge(object):
     
@@ -21,6 +21,9 @@ class Edge(object):
         self.node1 = node1
         self.node2 = node2
         
+        # Original edges this edge stands for, see Reduction.
+        self.weight = 1
+        
         # Append this edge to the vertices.
         node1.edges.append(self)
         node2.edges.append(self)
@@ -31,15 +34,21 @@ class Edge(object):
         """
         return str(self.node1) + ' <-> ' + str(self.node2)
     
-    def bridge_coeff(self):
+    def bridge_coeff(self, adj=None):
         """
         Finds the bridging coefficient of this edge.
+        
+        Key arguments:
+        adj -- adjacency view of the graph. [optional]
         """
-        num = self.node1.deg() * self.node1.bridge_coeff() + \
-              self.node2.deg() * self.node2.bridge_coeff()
+        if not adj:
+            adj = Adjacency(list(set([self.node1, self.node2] + self.node1.nbrs() + self.node2.nbrs())))
+        
+        num = self.node1.deg() * self.node1.bridge_coeff(adj) + \
+              self.node2.deg() * self.node2.bridge_coeff(adj)
         
         den = (self.node1.deg() + self.node2.deg()) * \
-              (len(self.node1.nbrs(self.node2)) + 1)
+              (adj.common(self) + 1)
         
         return num / float(den)
     
@@ -48,21 +57,9 @@ class Edge(object):
         Find the betweenness centrality for this edge.
         
         Key arguments:
-        paths -- a dictionary of all the shortest paths.
+        paths -- the shortest paths of the graph.
         """
-        ret = 0.0
-        
-        for node1, node2 in combinations(paths.keys(), 2):
-            # There theoretically can be no shortests paths if we deleted
-            #  a bridge, but the density of the new clusters didn't meet the threshold.
-            if paths[node1][node2] != None:
-                # A direct path from one to another still counts as a shortest path.
-                if len(paths[node1][node2]) == 0:
-                    ret += 1.0
-                else:
-                    ret += sum([1 for path in paths[node1][node2] if self.node1 in path and self.node2 in path]) / float(len(paths[node1][node2]))
-        
-        return ret
+        return paths.btwns(self)
     
     def destroy(self):
         """
@@ -0,0 +1,92 @@
+"""
+Hop distances of a graph, many sources at a time.
+
+@package bridgecut
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+class Hops(object):
+    
+    # Most sources searched together, one bit of an integer each.
+    WIDTH = 4096
+    
+    @classmethod
+    def count(cls, bits):
+        """
+        Returns the number of sources in a set of bits.
+        
+        Key arguments:
+        bits -- the bits.
+        """
+        return bin(bits).count('1')
+    
+    def __init__(self, graph):
+        """
+        Init.
+        
+        Every node keeps the sources that reached it as the bits of one
+        integer, so one pass over the edges moves the BFS of every source
+        a level further, instead of one pass per source.
+        
+        Key arguments:
+        graph -- the graph.
+        """
+        self.nodes = graph.nodes
+        
+        # Position of each node, and the positions of its neighbors.
+        self.index = {}
+        for i in range(len(self.nodes)):
+            self.index[self.nodes[i]] = i
+        
+        self.nbrs = []
+        for node in self.nodes:
+            self.nbrs.append([self.index[nbr] for nbr in node.nbrs()])
+    
+    def batches(self, sources):
+        """
+        Yields the sources a batch at a time.
+        
+        Key arguments:
+        sources -- the source nodes.
+        """
+        for i in range(0, len(sources), self.WIDTH):
+            yield sources[i:i + self.WIDTH]
+    
+    def levels(self, sources):
+        """
+        Yields the hops of each level and the sources first reaching each
+        node at that many hops, by node position.
+        
+        The source at position j of the list is bit j.
+        
+        Key arguments:
+        sources -- the source nodes.
+        """
+        visited = [0] * len(self.nodes)
+        
+        frontier = {}
+        for j in range(len(sources)):
+            i = self.index[sources[j]]
+            frontier[i] = frontier.get(i, 0) | (1 << j)
+            visited[i] = frontier[i]
+        
+        dist = 0
+        while frontier:
+            yield dist, frontier
+            
+            # Every node passes its frontier on to its neighbors.
+            reached = {}
+            for i, bits in frontier.iteritems():
+                for nbr in self.nbrs[i]:
+                    reached[nbr] = reached.get(nbr, 0) | bits
+            
+            # Only the sources that never got there before count.
+            frontier = {}
+            for i, bits in reached.iteritems():
+                bits &= ~visited[i]
+                if bits:
+                    visited[i] |= bits
+                    frontier[i] = bits
+            
+            dist += 1
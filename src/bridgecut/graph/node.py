@@ -6,7 +6,7 @@ Node of a graph.
 @copyright 2011 Aaron Zampaglione
 @license MIT
 """
-from bridgecut.lib.util import combinations
+from adjacency import Adjacency
 
 class Node(object):
     
@@ -21,6 +21,16 @@ class Node(object):
         
         # Init node's edges.
         self.edges = []
+        
+        # Original nodes this node stands for and original edges folded
+        #  inside it, see Reduction.
+        self.weight = 1
+        self.internal = 0
+        
+        # Values of the original nodes folded into this one, in order, and
+        #  the betweenness the routes between them give this node.
+        self.folded = []
+        self.inner = 0.0
     
     def __str__(self):
         """
@@ -28,30 +38,31 @@ class Node(object):
         """
         return self.value  
     
-    def bridge_coeff(self):
+    def bridge_coeff(self, adj=None):
         """
         Finds the bridging coefficient of this node.
+        
+        Each neighbor contributes the share of its other edges that leave
+        this node's neighborhood, that is the edges not going to a common
+        neighbor.
+        
+        Key arguments:
+        adj -- adjacency view of the graph. [optional]
         """
         if self.deg() == 0:
             return 0.0
         
-        num = 0.0
+        if not adj:
+            adj = Adjacency([self] + self.nbrs())
         
-        # Find the neighborhood, including myself.
-        nbrh = self.nbrs()
-        nbrh.insert(0, self)
+        num = 0.0
         
-        for n in self.nbrs():
+        for edge in self.edges:
+            n = edge.node(self)
             if n.deg() == 1:
                 continue
             
-            nbrs = list(nbrh)
-            nbrs.remove(n)
-            edges = []
-            for nbr in nbrs:
-                edges.extend(nbr.edges)
-            
-            num += len(set(n.edges).difference(edges)) / float(n.deg() - 1)
+            num += (n.deg() - 1 - adj.common(edge)) / float(n.deg() - 1)
         
         return num / float(self.deg())
     
@@ -60,18 +71,9 @@ class Node(object):
         Find the betweenness centrality for this node.
         
         Key arguments:
-        paths -- a dictionary of all the shortest paths.
+        paths -- the shortest paths of the graph.
         """
-        ret = 0.0
-        
-        for node1, node2 in combinations(paths.keys(), 2):
-            # There theoretically can be no shortests paths if we deleted
-            #  a bridge, but the density of the new clusters didn't meet the threshold.
-            if node1 != self and node2 != self and paths[node1][node2]:
-                # Look at all shortest paths from node1 to node2.
-                ret += sum([1 for path in paths[node1][node2] if self in path]) / float(len(paths[node1][node2]))
-        
-        return ret  
+        return paths.btwns(self)
     
     def deg(self):
         """
@@ -0,0 +1,258 @@
+"""
+Shortest paths of a graph.
+
+@package bridgecut
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+from bisect import bisect_left, bisect_right
+
+class Paths(object):
+    
+    def __init__(self, nodes):
+        """
+        Init.
+        
+        The shortest paths are never stored as lists.  Every source keeps
+        its BFS tree (the edge each node was discovered through) and the
+        predecessors of each node on the level above it.  A route from the
+        source to a target is the tree branch ending in one of the
+        target's predecessors, so every target has one route per
+        predecessor.
+        
+        Routes between two nodes always come from the source that is first
+        in node order, exactly like the reverse references the full path
+        lists used to have.
+        
+        Key arguments:
+        nodes -- the graph's nodes, in order.
+        """
+        self.nodes = nodes
+        
+        # Position of each node, used to decide which source owns a pair.
+        self.index = {}
+        for i in range(len(nodes)):
+            self.index[nodes[i]] = i
+        
+        # Whether any node stands for others, see Reduction.
+        self.reduced = len([node for node in nodes if node.folded]) > 0
+        
+        # BFS results, keyed by source node.
+        self.trees = {}
+        
+        # Betweenness for every node and edge, built on the first request.
+        self.node_btwns = None
+        self.edge_btwns = None
+    
+    def accumulate(self, src, order, parents, preds):
+        """
+        Adds the betweenness the pairs owned by a source give.
+        
+        Key arguments:
+        src     -- source node
+        order   -- the nodes in the order they were visited.
+        parents -- edge each visited node was discovered through.
+        preds   -- neighbors of each visited node one level closer to the source.
+        """
+        if self.reduced:
+            self.fold(src, order, parents, preds)
+            return
+        
+        i = self.index[src]
+        
+        weights = {}
+        for node in order:
+            weights[node] = 0.0
+        
+        # Only targets after the source own the pair.
+        for node in order:
+            if self.index[node] > i:
+                share = 1.0 / len(preds[node])
+                for pred in preds[node]:
+                    weights[pred] += share
+        
+        # Leaves first, so each subtree is complete before its parent.
+        for j in range(len(order) - 1, 0, -1):
+            node = order[j]
+            edge = parents[node]
+            parent = edge.node(node)
+            weight = weights[node]
+            self.node_btwns[node] += weight
+            if parent != src:
+                self.edge_btwns[edge] = self.edge_btwns.get(edge, 0.0) + weight
+            weights[parent] += weights[node]
+    
+    def add(self, src, order, dists, parents, preds):
+        """
+        Adds the BFS results of a source node.
+        
+        Key arguments:
+        src     -- source node
+        order   -- the nodes in the order they were visited.
+        dists   -- hops from the source for each visited node.
+        parents -- edge each visited node was discovered through.
+        preds   -- neighbors of each visited node one level closer to the source.
+        """
+        self.trees[src] = (order, dists, parents, preds)
+    
+    def btwns(self, item):
+        """
+        Returns the betweenness centrality of a node or an edge.
+        
+        A route counts for a node when the node lies inside the route, and
+        for an edge when both of its nodes do.  Each pair of nodes adds the
+        fraction of its routes that count.
+        
+        Key arguments:
+        item -- node or edge.
+        """
+        if self.node_btwns == None:
+            self.build()
+        
+        if item in self.node_btwns:
+            return self.node_btwns[item]
+        
+        return self.edge_btwns.get(item, 0.0)
+    
+    def build(self):
+        """
+        Accumulates the betweenness of every node and edge.
+        
+        Each target spreads one unit over its predecessors.  Since a route
+        is a branch of the source's BFS tree, the share of a node is the
+        total spread over its subtree, which is collected in a single pass
+        from the leaves back up to the source.
+        
+        Nodes of a reduced graph stand for several original nodes, so a
+        pair counts once for every pair of original nodes it stands for,
+        see fold.
+        """
+        self.node_btwns = {}
+        self.edge_btwns = {}
+        
+        for node in self.nodes:
+            self.node_btwns[node] = node.inner
+        
+        for src in self.nodes:
+            order, _, parents, preds = self.trees[src]
+            self.accumulate(src, order, parents, preds)
+    
+    def fold(self, src, order, parents, preds):
+        """
+        Adds the betweenness the pairs of original nodes owned by a
+        source's side give, for a graph with folded pendant trees.
+        
+        An original pair is owned by whichever of its nodes is first.  A
+        route to a node itself is spread over its predecessors, while a
+        route to a node folded into it enters through its BFS parent, so
+        the node is inside the route.  A route from a node folded into the
+        source has the source inside it too, and then also counts for the
+        edges at the source.  Routes between nodes folded into the same
+        node never leave their tree and are the node's inner betweenness.
+        
+        Key arguments:
+        src     -- source node
+        order   -- the nodes in the order they were visited.
+        parents -- edge each visited node was discovered through.
+        preds   -- neighbors of each visited node one level closer to the source.
+        """
+        # Routes with the source at an end, and with the source inside.
+        ends = dict.fromkeys(order, 0.0)
+        inners = dict.fromkeys(order, 0.0)
+        
+        for node in order[1:]:
+            spread, spread_inner, through, through_inner = self.pairs(src, node)
+            
+            ends[node] += through
+            inners[node] += through_inner
+            
+            if spread or spread_inner:
+                share = 1.0 / len(preds[node])
+                for pred in preds[node]:
+                    ends[pred] += spread * share
+                    inners[pred] += spread_inner * share
+        
+        # Leaves first, so each subtree is complete before its parent.
+        for j in range(len(order) - 1, 0, -1):
+            node = order[j]
+            edge = parents[node]
+            parent = edge.node(node)
+            weight = ends[node] + inners[node]
+            self.node_btwns[node] += weight
+            if parent != src:
+                self.edge_btwns[edge] = self.edge_btwns.get(edge, 0.0) + weight
+            elif inners[node]:
+                self.edge_btwns[edge] = self.edge_btwns.get(edge, 0.0) + inners[node]
+            ends[parent] += ends[node]
+            inners[parent] += inners[node]
+        
+        self.node_btwns[src] += inners[src]
+    
+    def pairs(self, src, node):
+        """
+        Returns how many original pairs between two nodes the source's
+        side owns: those spread over the node's predecessors, with the
+        source at an end and inside the route, then those entering
+        through the node's parent, the same two ways.
+        
+        Key arguments:
+        src  -- source node.
+        node -- the other node.
+        """
+        spread = 0
+        if self.index[node] > self.index[src]:
+            spread = 1
+        
+        if not src.folded and not node.folded:
+            return spread, 0, 0, 0
+        
+        through = len(node.folded) - bisect_right(node.folded, src.value)
+        spread_inner = bisect_left(src.folded, node.value)
+        through_inner = 0
+        for value in node.folded:
+            through_inner += bisect_left(src.folded, value)
+        
+        return spread, spread_inner, through, through_inner
+    
+    def dist(self, node1, node2):
+        """
+        Returns the number of hops between two nodes.
+        
+        None is returned when there is no route between them.
+        
+        Key arguments:
+        node1 -- node1.
+        node2 -- node2.
+        """
+        return self.trees[node1][1].get(node2)
+    
+    def routes(self, node1, node2):
+        """
+        Rebuilds the shortest routes between two nodes.
+        
+        Each route lists the nodes between node1 and node2, excluding both.
+        None is returned when there is no route between them.
+        
+        Key arguments:
+        node1 -- node1.
+        node2 -- node2.
+        """
+        if self.index[node1] > self.index[node2]:
+            node1, node2 = node2, node1
+        
+        _, dists, parents, preds = self.trees[node1]
+        
+        if node1 == node2 or not node2 in dists:
+            return None
+        
+        ret = []
+        for pred in preds[node2]:
+            route = []
+            node = pred
+            while node != node1:
+                route.insert(0, node)
+                node = parents[node].node(node)
+            ret.append(route)
+        
+        return ret
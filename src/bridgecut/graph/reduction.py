@@ -0,0 +1,258 @@
+"""
+Graph reduction.
+
+@package bridgecut
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+from edge import Edge
+from node import Node
+
+from collections import deque
+
+class Reduction(object):
+    
+    def __init__(self, graph, trees=True, chains=True, match=False):
+        """
+        Init.
+        
+        Pendant trees are folded into the node they hang from, chains of
+        degree two nodes into a single node, and matched pairs of nodes
+        into one another.  Every node of the reduced graph keeps the
+        number of original nodes it stands for (weight) and the original
+        edges folded inside it (internal), and every edge the original
+        edges it stands for (weight), so the density of a reduced cluster
+        is the density of the nodes it expands to.
+        
+        Nodes also keep the values folded into them (folded), so the
+        betweenness counts each pair of original nodes on the side that
+        owns it, and the routes between the nodes of a folded tree that
+        pass through the node it hangs from (inner), see Paths.fold.  The
+        edges keep the order of the original graph, so the BFS trees
+        break ties the same way.  Only the betweenness of folded trees is
+        the original one, for the nodes and edges left; chains and
+        matches make routes shorter.
+        
+        Key arguments:
+        graph  -- the graph to reduce.
+        trees  -- strip pendant trees. [optional]
+        chains -- compress chains of degree two nodes. [optional]
+        match  -- fold each node into its heaviest neighbor, once. [optional]
+        """
+        self.original = graph
+        
+        self.nbrs = {}
+        self.weights = {}
+        self.internals = {}
+        self.inners = {}
+        self.folded = {}
+        self.members = {}
+        
+        # Neighbors of each node, with the original edges to them.
+        for node in graph.nodes:
+            nbrs = self.nbrs[node.value] = {}
+            for edge in node.edges:
+                nbrs[edge.node(node).value] = edge.weight
+            self.weights[node.value] = node.weight
+            self.internals[node.value] = node.internal
+            self.inners[node.value] = node.inner
+            self.folded[node.value] = list(node.folded)
+            self.members[node.value] = [node.value]
+        
+        if trees:
+            self.strip()
+        
+        if chains:
+            self.compress()
+            
+            # A chain that starts and ends on the same node is a pendant now.
+            if trees:
+                self.strip()
+        
+        if match:
+            self.match()
+        
+        nodes = {}
+        for value in self.nbrs:
+            node = nodes[value] = Node(value)
+            node.weight = self.weights[value]
+            node.internal = self.internals[value]
+            node.inner = self.inners[value]
+            node.folded = sorted(self.folded[value])
+        
+        # Reduced node holding each original node.
+        self.owners = {}
+        for value, members in self.members.items():
+            for member in members:
+                self.owners[member] = value
+        
+        # Edges in the order of the original ones they stand for.
+        linked = set()
+        for node in graph.nodes:
+            for edge in node.edges:
+                value = self.owners[node.value]
+                nbr = self.owners[edge.node(node).value]
+                if value < nbr and not (value, nbr) in linked:
+                    linked.add((value, nbr))
+                    Edge(nodes[value], nodes[nbr]).weight = self.nbrs[value][nbr]
+        
+        self.graph = graph.__class__(nodes)
+    
+    def compress(self):
+        """
+        Folds every chain of two or more degree two nodes into its
+        smallest node.
+        """
+        visited = set()
+        for value in sorted(self.nbrs):
+            if value in visited or not value in self.nbrs or len(self.nbrs[value]) != 2:
+                continue
+            
+            # Walk both ways until the chain ends.
+            chain = [value]
+            cycle = False
+            ends = sorted(self.nbrs[value])
+            for nbr in ends:
+                prev = value
+                node = nbr
+                walk = []
+                while len(self.nbrs[node]) == 2 and node != value:
+                    walk.append(node)
+                    prev, node = node, [n for n in self.nbrs[node] if n != prev][0]
+                
+                # Nothing but degree two nodes, a ring has no ends to keep.
+                if node == value:
+                    cycle = True
+                    chain.extend(walk)
+                    break
+                
+                if nbr == ends[0]:
+                    chain = list(reversed(walk)) + chain
+                else:
+                    chain = chain + walk
+            
+            visited.update(chain)
+            
+            if cycle or len(chain) < 2:
+                continue
+            
+            keep = min(chain)
+            for member in chain:
+                if member != keep:
+                    self.fold(keep, member)
+    
+    def expand(self, clusters):
+        """
+        Returns the clusters of the reduced graph as clusters of the
+        original graph.
+        
+        Key arguments:
+        clusters -- clusters of the reduced graph.
+        """
+        ret = []
+        for cluster in clusters:
+            values = []
+            for node in cluster.nodes:
+                values.extend(self.members[node.value])
+            ret.append(self.original.subgraph(values))
+        
+        return ret
+    
+    def fold(self, keep, value):
+        """
+        Folds one node into another.
+        
+        The edges between them become internal to the kept node, the
+        folded node's other edges are added to the kept node's.
+        
+        Key arguments:
+        keep  -- value of the node to keep.
+        value -- value of the node to fold.
+        """
+        for nbr, weight in self.nbrs.pop(value).items():
+            del self.nbrs[nbr][value]
+            if nbr == keep:
+                self.internals[keep] += weight
+            else:
+                self.nbrs[keep][nbr] = self.nbrs[nbr][keep] = self.nbrs[keep].get(nbr, 0) + weight
+        
+        self.weights[keep] += self.weights.pop(value)
+        self.internals[keep] += self.internals.pop(value)
+        self.inners.pop(value)
+        self.folded[keep].append(value)
+        self.folded[keep].extend(self.folded.pop(value))
+        self.members[keep].extend(self.members.pop(value))
+    
+    def match(self):
+        """
+        Folds pairs of neighbors into one another.
+        
+        Lightest nodes go first, each picking the unmatched neighbor it
+        shares the most original edges with, then the most neighbors, then
+        the lightest one.  Every node is in at most one pair, so the graph
+        shrinks by up to half.
+        """
+        pairs = []
+        matched = set()
+        for value in sorted(self.nbrs, key=lambda value: (self.weights[value], value)):
+            if value in matched:
+                continue
+            
+            nbrs = self.nbrs[value]
+            
+            best = None
+            best_score = None
+            for nbr in sorted(nbrs):
+                if nbr in matched:
+                    continue
+                
+                common = len([n for n in self.nbrs[nbr] if n in nbrs])
+                score = (nbrs[nbr], common, -self.weights[nbr])
+                if best_score == None or score > best_score:
+                    best = nbr
+                    best_score = score
+            
+            if best != None:
+                matched.add(value)
+                matched.add(best)
+                pairs.append((min(value, best), max(value, best)))
+        
+        for keep, value in pairs:
+            self.fold(keep, value)
+    
+    def owner(self, value):
+        """
+        Returns the value of the reduced node holding an original node,
+        None if there is no such node.
+        
+        Key arguments:
+        value -- value of the original node.
+        """
+        return self.owners.get(value)
+    
+    def strip(self):
+        """
+        Folds every leaf into its neighbor until no leaves are left.
+        
+        The last edge of a tree is kept, so a tree on its own can still be
+        cut in two.
+        """
+        leaves = deque([value for value in sorted(self.nbrs) if len(self.nbrs[value]) == 1])
+        while leaves:
+            value = leaves.popleft()
+            if not value in self.nbrs or len(self.nbrs[value]) != 1:
+                continue
+            
+            anchor = list(self.nbrs[value])[0]
+            if len(self.nbrs[anchor]) < 2:
+                continue
+            
+            # Routes from the leaf's tree to the rest of the anchor's pass
+            #  through the anchor.
+            self.inners[anchor] += self.weights[value] * (self.weights[anchor] - 1)
+            
+            self.fold(anchor, value)
+            
+            if len(self.nbrs[anchor]) == 1:
+                leaves.append(anchor)
@@ -0,0 +1,119 @@
+"""
+Shortest paths of a graph, counted route by route.
+
+@package bridgecut
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+from paths import Paths
+
+class Routes(Paths):
+    
+    def build(self):
+        """
+        Accumulates the betweenness of every node and edge.
+        
+        Every route of every pair is rebuilt and counted on its own, the
+        way betweenness is defined.  Much slower than the subtree pass,
+        it is kept as a reference to check faster engines against.
+        """
+        self.node_btwns = {}
+        self.edge_btwns = {}
+        
+        for node in self.nodes:
+            self.node_btwns[node] = node.inner
+        
+        if self.reduced:
+            for src in self.nodes:
+                for node in self.nodes:
+                    if node != src and node in self.trees[src][1]:
+                        self.owned(src, node)
+            return
+        
+        for i in range(len(self.nodes)):
+            node1 = self.nodes[i]
+            for j in range(i + 1, len(self.nodes)):
+                node2 = self.nodes[j]
+                
+                routes = self.routes(node1, node2)
+                if not routes:
+                    continue
+                
+                share = 1.0 / len(routes)
+                for route in routes:
+                    for node in route:
+                        self.node_btwns[node] += share
+                    
+                    # Edges with both nodes inside the route.
+                    for k in range(len(route) - 1):
+                        for edge in route[k].edges:
+                            if edge.node(route[k]) == route[k + 1]:
+                                self.edge_btwns[edge] = self.edge_btwns.get(edge, 0.0) + share
+    
+    def branch(self, src, node):
+        """
+        Returns the nodes of the source's BFS tree branch ending in a node,
+        without the source.
+        
+        Key arguments:
+        src  -- source node.
+        node -- the last node of the branch.
+        """
+        parents = self.trees[src][2]
+        
+        ret = []
+        while node != src:
+            ret.insert(0, node)
+            node = parents[node].node(node)
+        
+        return ret
+    
+    def count(self, src, route, share, inner):
+        """
+        Adds a share of a route to the nodes and edges inside it.
+        
+        Key arguments:
+        src   -- source node the route starts from.
+        route -- the nodes of the route after the source.
+        share -- the share of the route.
+        inner -- the part of the share with the source inside the route.
+        """
+        for node in route:
+            self.node_btwns[node] += share
+        
+        # Edges with both nodes inside the route.
+        for k in range(len(route) - 1):
+            for edge in route[k].edges:
+                if edge.node(route[k]) == route[k + 1]:
+                    self.edge_btwns[edge] = self.edge_btwns.get(edge, 0.0) + share
+        
+        if inner:
+            self.node_btwns[src] += inner
+            if route:
+                for edge in src.edges:
+                    if edge.node(src) == route[0]:
+                        self.edge_btwns[edge] = self.edge_btwns.get(edge, 0.0) + inner
+    
+    def owned(self, src, node):
+        """
+        Counts the routes of the original pairs between two nodes of a
+        reduced graph owned by the source's side, see Paths.fold.
+        
+        Key arguments:
+        src  -- source node.
+        node -- the other node.
+        """
+        spread, spread_inner, through, through_inner = self.pairs(src, node)
+        
+        preds = self.trees[src][3][node]
+        if spread or spread_inner:
+            for pred in preds:
+                route = []
+                if pred != src:
+                    route = self.branch(src, pred)
+                self.count(src, route, (spread + spread_inner) / float(len(preds)),
+                           spread_inner / float(len(preds)))
+        
+        if through or through_inner:
+            self.count(src, self.branch(src, node), float(through + through_inner), float(through_inner))
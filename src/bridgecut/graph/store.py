@@ -0,0 +1,393 @@
+"""
+Edge list store on disk.
+
+@package bridgecut
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+from disknode import DiskNode
+
+from array import array
+import copy
+import heapq
+import mmap
+import os
+import struct
+
+class Store(object):
+    
+    # Files of a graph store.
+    VALUES = 'values'   # Node values, sorted, one per line.
+    INDEX = 'index'     # Offset of each value in the values file.
+    OFFSETS = 'offsets' # Offset of each node's neighbors in the targets file.
+    TARGETS = 'targets' # Neighbor ids of each node, one slot each.
+    MATES = 'mates'     # Slot of the same edge in the neighbor's list.
+    
+    @classmethod
+    def factory(cls, name, path, chunk=1000000):
+        """
+        Stores an edge list on disk and returns the new store.
+        
+        Nothing larger than a chunk is ever held in memory, the node values
+        and the edges are sorted in runs and merged.  A node's id is the
+        position of its value in sorted order, so ids follow the same order
+        the in memory graph uses.  Each node lists its smaller neighbors
+        in id order, then its larger ones in the order their edge first
+        appears in the file, which is the order the edges of a copied in
+        memory graph are in, so both break ties the same way.
+        
+        Key arguments:
+        name  -- the edge list file.
+        path  -- directory of the new store.
+        chunk -- number of values/edges sorted in memory at once. [optional]
+        """
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        
+        # Pass one, the node dictionary.
+        runs = []
+        buf = set()
+        for value1, value2 in cls.parse(name):
+            buf.add(value1)
+            buf.add(value2)
+            if len(buf) >= chunk:
+                runs.append(cls.run(path, 'values' + str(len(runs)), [value + '\n' for value in sorted(buf)]))
+                buf = set()
+        runs.append(cls.run(path, 'values' + str(len(runs)), [value + '\n' for value in sorted(buf)]))
+        
+        values = open(os.path.join(path, cls.VALUES), 'wb')
+        index = open(os.path.join(path, cls.INDEX), 'wb')
+        offset = 0
+        last = None
+        for line in heapq.merge(*[open(run, 'rb') for run in runs]):
+            if line != last:
+                index.write(struct.pack('<Q', offset))
+                values.write(line)
+                offset += len(line)
+                last = line
+        index.write(struct.pack('<Q', offset))
+        values.close()
+        index.close()
+        
+        for run in runs:
+            os.remove(run)
+        
+        # Pass two, the edges in both directions, keyed by where they go.
+        store = cls(path)
+        n = store.n
+        
+        def edges():
+            line = 0
+            for value1, value2 in cls.parse(name):
+                id1 = store.node(value1)
+                id2 = store.node(value2)
+                line += 1
+                
+                # Self loops never separate anything, leave them out.
+                if id1 == id2:
+                    continue
+                
+                for src, dst in ((id1, id2), (id2, id1)):
+                    if dst < src:
+                        key = dst
+                    else:
+                        key = (1 << 32) + line
+                    yield struct.pack('>IQI', src, key, dst)
+        
+        offsets = open(os.path.join(path, cls.OFFSETS), 'wb')
+        targets = open(os.path.join(path, cls.TARGETS), 'wb')
+        offset = 0
+        node = 0
+        seen = set()
+        for record in cls.sort(path, 'edges', edges(), chunk):
+            src, _, dst = struct.unpack('>IQI', record)
+            
+            # Close off every node up to this edge's source.
+            while node <= src:
+                offsets.write(struct.pack('<Q', offset))
+                node += 1
+                seen = set()
+            
+            # Only the first line of an edge counts.
+            if dst in seen:
+                continue
+            seen.add(dst)
+            
+            targets.write(struct.pack('<I', dst))
+            offset += 1
+        while node <= n:
+            offsets.write(struct.pack('<Q', offset))
+            node += 1
+        offsets.close()
+        targets.close()
+        store.close()
+        
+        # Pass three, the two slots of every edge find each other.
+        store = cls(path)
+        
+        def ends():
+            for src in xrange(n):
+                start, end = struct.unpack_from('<QQ', store.offsets, src * 8)
+                for slot in xrange(start, end):
+                    dst = struct.unpack_from('<I', store.targets, slot * 4)[0]
+                    yield struct.pack('>IIQ', min(src, dst), max(src, dst), slot)
+        
+        def pairs():
+            last = None
+            for record in cls.sort(path, 'ends', ends(), chunk):
+                if last:
+                    slot1 = struct.unpack('>IIQ', last)[2]
+                    slot2 = struct.unpack('>IIQ', record)[2]
+                    yield struct.pack('>QQ', slot1, slot2)
+                    yield struct.pack('>QQ', slot2, slot1)
+                    last = None
+                else:
+                    last = record
+        
+        # The mates come last, a store is only complete once they are there.
+        mates = open(os.path.join(path, 'run.' + cls.MATES), 'wb')
+        for record in cls.sort(path, 'pairs', pairs(), chunk):
+            mates.write(struct.pack('<I', struct.unpack('>QQ', record)[1]))
+        mates.close()
+        store.close()
+        os.rename(mates.name, os.path.join(path, cls.MATES))
+        
+        return cls(path)
+    
+    @classmethod
+    def parse(cls, name):
+        """
+        Reads the edges of an edge list file.
+        
+        Key arguments:
+        name -- the edge list file.
+        """
+        handle = open(name, 'r')
+        for line in handle:
+            items = line.replace('\t', ' ').replace('\n', '').replace('\r', '').split(' ')
+            if len(items) >= 2:
+                yield items[0], items[1]
+        handle.close()
+    
+    @classmethod
+    def records(cls, name, width):
+        """
+        Reads the records of a run.
+        
+        Key arguments:
+        name  -- the run file.
+        width -- bytes of a record.
+        """
+        handle = open(name, 'rb')
+        while True:
+            data = handle.read(width * 4096)
+            if not data:
+                break
+            for i in xrange(0, len(data), width):
+                yield data[i:i + width]
+        handle.close()
+    
+    @classmethod
+    def run(cls, path, name, records):
+        """
+        Writes a sorted run and returns its file name.
+        
+        Key arguments:
+        path    -- directory of the store.
+        name    -- name of the run.
+        records -- the sorted records.
+        """
+        name = os.path.join(path, 'run.' + name)
+        handle = open(name, 'wb')
+        handle.write(''.join(records))
+        handle.close()
+        
+        return name
+    
+    @classmethod
+    def sort(cls, path, name, records, chunk):
+        """
+        Yields records of the same width in sorted order.
+        
+        Runs of a chunk of records are sorted in memory, written out and
+        merged.  Records are packed big endian, so they sort as strings.
+        
+        Key arguments:
+        path    -- directory of the store.
+        name    -- name of the sort, for its run files.
+        records -- the records.
+        chunk   -- number of records sorted in memory at once.
+        """
+        runs = []
+        width = 0
+        buf = []
+        for record in records:
+            width = len(record)
+            buf.append(record)
+            if len(buf) >= chunk:
+                buf.sort()
+                runs.append(cls.run(path, name + str(len(runs)), buf))
+                buf = []
+        buf.sort()
+        runs.append(cls.run(path, name + str(len(runs)), buf))
+        
+        if width:
+            for record in heapq.merge(*[cls.records(run, width) for run in runs]):
+                yield record
+        
+        for run in runs:
+            os.remove(run)
+    
+    def __init__(self, path):
+        """
+        Init.
+        
+        The files are memory mapped and only read.  What changes while a
+        graph is cut, the edges removed and the degrees left, is kept in
+        memory with a byte per slot and an integer per node.
+        
+        Key arguments:
+        path -- directory of the store.
+        """
+        self.path = path
+        
+        self.files = []
+        self.values = self.map(self.VALUES)
+        self.index = self.map(self.INDEX)
+        self.offsets = self.map(self.OFFSETS)
+        self.targets = self.map(self.TARGETS)
+        self.mates = self.map(self.MATES)
+        
+        # Number of nodes and of slots, two per edge.
+        self.n = max(len(self.index) // 8 - 1, 0)
+        self.m = len(self.targets) // 4
+        
+        # Slots of the edges removed so far, and each node's degree left.
+        self.cut = bytearray(self.m)
+        self.degs = array('l', [0]) * self.n
+        if self.offsets:
+            for node in xrange(self.n):
+                start, end = struct.unpack_from('<QQ', self.offsets, node * 8)
+                self.degs[node] = end - start
+        
+        self.nodes = [DiskNode(self, node, self.value(node)) for node in xrange(self.n)]
+    
+    def __str__(self):
+        """
+        Returns store as a string representation.
+        """
+        return self.path + ' (' + str(self.n) + ' nodes, ' + str(self.m // 2) + ' edges)'
+    
+    def close(self):
+        """
+        Closes the store's files.
+        """
+        for handle, mm in self.files:
+            mm.close()
+            handle.close()
+        self.files = []
+    
+    def copy(self):
+        """
+        Returns a copy with its own removed edges, reading the same files.
+        """
+        ret = copy.copy(self)
+        ret.cut = bytearray(self.cut)
+        ret.degs = array('l', self.degs)
+        ret.nodes = [DiskNode(ret, node.id, node.value) for node in self.nodes]
+        
+        return ret
+    
+    def destroy(self, slot):
+        """
+        Removes the edge in a slot.
+        
+        Key arguments:
+        slot -- either slot of the edge.
+        """
+        mate = self.mate(slot)
+        self.cut[slot] = 1
+        self.cut[mate] = 1
+        self.degs[self.target(slot)] -= 1
+        self.degs[self.target(mate)] -= 1
+    
+    def map(self, name):
+        """
+        Memory maps one of the store's files.
+        
+        Key arguments:
+        name -- the file.
+        """
+        # Files not written yet read as empty, and those can't be mapped.
+        name = os.path.join(self.path, name)
+        if not os.path.exists(name) or not os.path.getsize(name):
+            return ''
+        
+        handle = open(name, 'rb')
+        mm = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self.files.append((handle, mm))
+        
+        return mm
+    
+    def mate(self, slot):
+        """
+        Returns the slot of the same edge in the neighbor's list.
+        
+        Key arguments:
+        slot -- the slot.
+        """
+        return struct.unpack_from('<I', self.mates, slot * 4)[0]
+    
+    def node(self, value):
+        """
+        Returns the id of a node value, looked up by binary search.
+        
+        Key arguments:
+        value -- the value to look for.
+        """
+        lo = 0
+        hi = self.n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            other = self.value(mid)
+            if other < value:
+                lo = mid + 1
+            elif other > value:
+                hi = mid
+            else:
+                return mid
+        
+        return None
+    
+    def slots(self, node):
+        """
+        Returns the slot and id of every neighbor a node still has, in order.
+        
+        Key arguments:
+        node -- node id.
+        """
+        start, end = struct.unpack_from('<QQ', self.offsets, node * 8)
+        targets = struct.unpack_from('<%dI' % (end - start), self.targets, start * 4)
+        
+        cut = self.cut
+        return [(start + i, targets[i]) for i in xrange(end - start) if not cut[start + i]]
+    
+    def target(self, slot):
+        """
+        Returns the id of the neighbor in a slot.
+        
+        Key arguments:
+        slot -- the slot.
+        """
+        return struct.unpack_from('<I', self.targets, slot * 4)[0]
+    
+    def value(self, node):
+        """
+        Returns the value of a node id.
+        
+        Key arguments:
+        node -- node id.
+        """
+        start, end = struct.unpack_from('<QQ', self.index, node * 8)
+        return self.values[start:end - 1]
@@ -1,37 +1,55 @@
 """
 Utility functions.
 
+Prefers the C implementations from itertools (Python >= 2.6) and falls
+back to lazy pure python generators on older interpreters.
+
 @package bridgecut
 @author Aaron Zampaglione <azampagl@my.fit.edu>
 @copyright 2011 Aaron Zampaglione
 @license MIT
 """
-def combinations(iterable, r):
-    # combinations('ABCD', 2) --> AB AC AD BC BD CD
-    # combinations(range(4), 3) --> 012 013 023 123
-    pool = tuple(iterable)
-    n = len(pool)
-    if r > n:
-        return
-    indices = range(r)
-    yield tuple(pool[i] for i in indices)
-    while True:
-        for i in reversed(range(r)):
-            if indices[i] != i + n - r:
-                break
-        else:
+try:
+    from itertools import combinations, product
+except ImportError:
+    def combinations(iterable, r):
+        # combinations('ABCD', 2) --> AB AC AD BC BD CD
+        # combinations(range(4), 3) --> 012 013 023 123
+        pool = tuple(iterable)
+        n = len(pool)
+        if r > n:
             return
-        indices[i] += 1
-        for j in range(i+1, r):
-            indices[j] = indices[j-1] + 1
-        yield tuple(pool[i] for i in indices)
+        indices = range(r)
+        yield tuple([pool[i] for i in indices])
+        while True:
+            for i in reversed(range(r)):
+                if indices[i] != i + n - r:
+                    break
+            else:
+                return
+            indices[i] += 1
+            for j in range(i+1, r):
+                indices[j] = indices[j-1] + 1
+            yield tuple([pool[i] for i in indices])
+
+    def product(*args, **kwds):
+        # product('ABCD', 'xy') --> Ax Ay Bx By Cx Cy Dx Dy
+        # product(range(2), repeat=3) --> 000 001 010 011 100 101 110 111
+        pools = map(tuple, args) * kwds.get('repeat', 1)
+        n = len(pools)
+        for pool in pools:
+            if not pool:
+                return
 
-def product(*args, **kwds):
-    # product('ABCD', 'xy') --> Ax Ay Bx By Cx Cy Dx Dy
-    # product(range(2), repeat=3) --> 000 001 010 011 100 101 110 111
-    pools = map(tuple, args) * kwds.get('repeat', 1)
-    result = [[]]
-    for pool in pools:
-        result = [x+[y] for x in result for y in pool]
-    for prod in result:
-        yield tuple(prod)
\ No newline at end of file
+        # Odometer over the pools, one tuple at a time.
+        indices = [0] * n
+        yield tuple([pool[0] for pool in pools])
+        while True:
+            for i in reversed(range(n)):
+                indices[i] += 1
+                if indices[i] < len(pools[i]):
+                    break
+                indices[i] = 0
+            else:
+                return
+            yield tuple([pools[i][indices[i]] for i in range(n)])
@@ -0,0 +1,147 @@
+"""
+Memory accounting of a run.
+
+@package bridgecut
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+from graph.counts import Counts
+from graph.paths import Paths
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+class Memory(object):
+    
+    # Bytes held by the BFS trees of every source, for each pair of nodes
+    #  and for each node and edge, measured on random graphs.
+    PAIR = 500
+    EDGE = 4
+    
+    # Bytes of a node and an edge of a graph.
+    NODE = 600
+    LINK = 400
+    
+    # Bytes of each distance sum the metrics keep.
+    SUM = 80
+    
+    @classmethod
+    def estimate(cls, n, m, k=0, sample=0):
+        """
+        Returns the estimated bytes of each part of a run.
+        
+        The parts are the graph, the shortest paths kept by Paths, the
+        betweenness counted by Counts and, given the number of clusters,
+        the distance sums of the metrics.
+        
+        Key arguments:
+        n      -- number of nodes.
+        m      -- number of edges.
+        k      -- number of clusters. [optional]
+        sample -- most nodes of each cluster the metrics sum for, 0 for all. [optional]
+        """
+        rows = n
+        if sample:
+            rows = min(n, sample * k)
+        
+        return {
+                'graph': cls.NODE * n + cls.LINK * m,
+                'paths': cls.PAIR * n * n + cls.EDGE * n * m,
+                'counts': cls.PAIR * n + cls.EDGE * m + cls.SUM * (n + m),
+                'metrics': cls.SUM * rows * k + cls.PAIR * n,
+                }
+    
+    @classmethod
+    def engine(cls, n, m, budget):
+        """
+        Returns the engine finding the betweenness within a budget.
+        
+        Key arguments:
+        n      -- number of nodes.
+        m      -- number of edges.
+        budget -- the most bytes a run may use.
+        """
+        sizes = cls.estimate(n, m)
+        if sizes['graph'] + sizes['paths'] <= budget:
+            return Paths
+        
+        return Counts
+    
+    @classmethod
+    def peak(cls):
+        """
+        Returns the high-water mark of this process (ru_maxrss), the most
+        bytes it has held so far, None if unknown.
+        """
+        if not resource:
+            return None
+        
+        # Kilobytes on Linux.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    
+    @classmethod
+    def sample(cls, n, m, k, budget):
+        """
+        Returns how many nodes of each cluster the metrics may sum for
+        within a budget, 0 for all of them.
+        
+        Key arguments:
+        n      -- number of nodes.
+        m      -- number of edges.
+        k      -- number of clusters.
+        budget -- the most bytes a run may use.
+        """
+        sizes = cls.estimate(n, m, k)
+        if not k or sizes['graph'] + sizes['metrics'] <= budget:
+            return 0
+        
+        left = budget - sizes['graph'] - cls.PAIR * n
+        return max(1, left // (cls.SUM * k * k))
+    
+    def __init__(self):
+        """
+        Init.
+        
+        The high-water mark can only grow, so a phase is charged with how
+        much it raised the mark, not with its own peak: a phase holding
+        less than an earlier one shows no growth.
+        """
+        self.phases = []
+        self.last = self.peak()
+    
+    def __str__(self):
+        """
+        Returns the phases as a string representation, the high-water
+        mark after each phase and how much the phase raised it.
+        
+        Phases that didn't raise the mark are left out, except the last.
+        """
+        lines = []
+        for name, peak, growth in self.phases:
+            # Only the phases that raised the mark, and the last one.
+            if growth == 0 and name != self.phases[-1][0]:
+                continue
+            
+            if peak == None:
+                lines.append(name + '\tunknown')
+            else:
+                lines.append('%s\thigh-water %.1f MB\t+%.1f MB' % (name, peak / 1048576.0, growth / 1048576.0))
+        
+        return '\n'.join(lines)
+    
+    def track(self, name):
+        """
+        Records the high-water mark at the end of a phase.
+        
+        Key arguments:
+        name -- name of the phase.
+        """
+        peak = self.peak()
+        if peak == None:
+            self.phases.append((name, None, None))
+        else:
+            self.phases.append((name, peak, peak - self.last))
+            self.last = peak
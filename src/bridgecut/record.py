@@ -0,0 +1,245 @@
+"""
+Columnar record of a run.
+
+@package bridgecut
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+import mmap
+import os
+import struct
+
+class Record(object):
+    
+    # Start of every record file.
+    MAGIC = 'BCR1'
+    
+    # Directory entry of a column: name, type, number of values, offset.
+    ENTRY = struct.Struct('<16scQQ')
+    
+    # Float and unsigned int columns, any other column holds strings.
+    TYPES = 'dI'
+    
+    @classmethod
+    def save(cls, name, results, clusters, davies_bouldin, silhouette, v, t, source='', memory=''):
+        """
+        Writes the record of a run.
+        
+        Every iteration is a row of the item, score, nodes removed and
+        clustering coefficient columns, every clustered node a row of the
+        node and label columns, the label being the position of its
+        cluster.
+        
+        Key arguments:
+        name           -- the record file.
+        results        -- the (item, score, nodes removed, clustering coefficient) of each iteration.
+        clusters       -- the node values of each cluster.
+        davies_bouldin -- the DB index.
+        silhouette     -- the average silhouette coefficient.
+        v              -- the version.
+        t              -- the density threshold.
+        source         -- the edge list file. [optional]
+        memory         -- the high-water memory growth of each phase, see Memory. [optional]
+        """
+        nodes = []
+        labels = []
+        for i in range(len(clusters)):
+            for value in clusters[i]:
+                nodes.append(value)
+                labels.append(i)
+        
+        # No score is stored as NaN.
+        scores = []
+        for result in results:
+            if result[1] == None:
+                scores.append(float('nan'))
+            else:
+                scores.append(float(result[1]))
+        
+        cls.write(name, [
+                         ('item', 's', [str(result[0]) for result in results]),
+                         ('score', 'd', scores),
+                         ('removed', 'I', [result[2] for result in results]),
+                         ('coeff', 'd', [result[3] for result in results]),
+                         ('node', 's', nodes),
+                         ('label', 'I', labels),
+                         ('db', 'd', [davies_bouldin]),
+                         ('silhouette', 'd', [silhouette]),
+                         ('version', 's', [v]),
+                         ('threshold', 'd', [float(t)]),
+                         ('source', 's', [source]),
+                         ('memory', 's', [memory]),
+                         ])
+    
+    @classmethod
+    def parse(cls, name):
+        """
+        Reads the columns of a run from the text output of main.py.
+        
+        Only the columns the text holds are there: item, score, removed,
+        coeff, node, label, db, silhouette and memory.
+        
+        Key arguments:
+        name -- the output file.
+        """
+        ret = {'item': [], 'score': [], 'removed': [], 'coeff': [], 'node': [], 'label': []}
+        memory = []
+        
+        section = None
+        for line in open(name, 'r').read().replace('\r', '').split('\n'):
+            if line.startswith('Top Items Removed:'):
+                section = 'results'
+            elif line.startswith('Clusters:'):
+                section = 'clusters'
+            elif line.startswith('DB Index:'):
+                ret['db'] = (float(line.split(':')[1].strip()),)
+            elif line.startswith('Average Silhouette Coefficient:'):
+                ret['silhouette'] = (float(line.split(':')[1].strip()),)
+            elif line.startswith('Memory:'):
+                section = 'memory'
+            elif section == 'results' and '\t-\t' in line and not line.startswith('\t#'):
+                item, score, removed, coeff = line.split('\t-\t')
+                
+                # No score is stored as NaN.
+                if score == 'None':
+                    score = 'nan'
+                
+                ret['item'].append(item.split('\t', 2)[2])
+                ret['score'].append(float(score))
+                ret['removed'].append(int(removed))
+                ret['coeff'].append(float(coeff))
+            elif section == 'clusters' and line.startswith('\t'):
+                label = len(set(ret['label']))
+                for value in line.strip().split(', '):
+                    ret['node'].append(value)
+                    ret['label'].append(label)
+            elif section == 'memory' and line.startswith('\t'):
+                memory.append(line[1:])
+        
+        ret['memory'] = ['\n'.join(memory)]
+        for column in ('score', 'removed', 'coeff', 'label'):
+            ret[column] = tuple(ret[column])
+        
+        return ret
+    
+    @classmethod
+    def scan(cls, names, *columns):
+        """
+        Yields the name and the chosen columns of many records.
+        
+        Runs made before records were written only have their text
+        output, which is read instead when there is no record.
+        
+        Key arguments:
+        names   -- the record files.
+        columns -- names of the columns to read.
+        """
+        for name in names:
+            text = os.path.splitext(name)[0] + '.txt'
+            if not os.path.exists(name) and os.path.exists(text):
+                found = cls.parse(text)
+                yield name, [found[column] for column in columns]
+                continue
+            
+            record = cls(name)
+            try:
+                yield name, [record.column(column) for column in columns]
+            finally:
+                record.close()
+    
+    @classmethod
+    def write(cls, name, columns):
+        """
+        Writes a record file.
+        
+        Key arguments:
+        name    -- the record file.
+        columns -- (name, type, values) of each column.
+        """
+        header = struct.calcsize('<4sI') + cls.ENTRY.size * len(columns)
+        
+        entries = []
+        data = []
+        offset = header
+        for column, kind, values in columns:
+            entries.append(cls.ENTRY.pack(column, kind, len(values), offset))
+            
+            if kind in cls.TYPES:
+                block = struct.pack('<%d%s' % (len(values), kind), *values)
+            else:
+                # The string offsets come first, then the strings themselves.
+                ends = [0]
+                for value in values:
+                    ends.append(ends[-1] + len(value))
+                block = struct.pack('<%dQ' % len(ends), *ends) + ''.join(values)
+            
+            data.append(block)
+            offset += len(block)
+        
+        # Write then rename, so readers never see half a record.
+        handle = open(name + '.tmp', 'wb')
+        handle.write(struct.pack('<4sI', cls.MAGIC, len(columns)))
+        handle.write(''.join(entries))
+        handle.write(''.join(data))
+        handle.close()
+        os.rename(name + '.tmp', name)
+    
+    def __init__(self, name):
+        """
+        Init.
+        
+        The file is mapped, not read, and a column is only decoded when
+        asked for, so an analysis pays for the columns it uses.
+        
+        Key arguments:
+        name -- the record file.
+        """
+        self.name = name
+        
+        handle = open(name, 'rb')
+        try:
+            self.data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            handle.close()
+        
+        magic, n = struct.unpack_from('<4sI', self.data, 0)
+        if magic != self.MAGIC:
+            self.data.close()
+            raise ValueError('Not a record: ' + name)
+        
+        self.columns = {}
+        for i in range(n):
+            column, kind, count, offset = self.ENTRY.unpack_from(self.data, struct.calcsize('<4sI') + i * self.ENTRY.size)
+            self.columns[column.rstrip('\0')] = (kind, count, offset)
+    
+    def close(self):
+        """
+        Unmaps the file.
+        """
+        self.data.close()
+    
+    def column(self, name):
+        """
+        Returns the values of a column.
+        
+        Key arguments:
+        name -- name of the column.
+        """
+        kind, count, offset = self.columns[name]
+        
+        if kind in self.TYPES:
+            return struct.unpack_from('<%d%s' % (count, kind), self.data, offset)
+        
+        ends = struct.unpack_from('<%dQ' % (count + 1), self.data, offset)
+        start = offset + 8 * (count + 1)
+        return [self.data[start + ends[i]:start + ends[i + 1]] for i in range(count)]
+    
+    def value(self, name):
+        """
+        Returns the only value of a column, such as a metric.
+        
+        Key arguments:
+        name -- name of the column.
+        """
+        return self.column(name)[0]
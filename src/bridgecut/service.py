@@ -0,0 +1,429 @@
+"""
+Clustering service.
+
+@package bridgecut
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+from core import BridgeCut
+from exception import BridgeCutException
+from graph.core import Graph
+
+import Queue
+import multiprocessing
+import sys
+import threading
+import time
+
+# Graphs built by a worker process, by name with the load they came
+#  from, and the edge lists, progress and cancelled jobs it shares with
+#  the service.
+resident = {}
+sources = None
+progress = None
+cancels = None
+
+def cluster(task):
+    """
+    Runs a job in a worker process, returns its state, outcome and the
+    iterations it ran.
+    
+    Only the graph's name and load are sent, the worker fetches the edge
+    list and builds the graph the first time it sees that load.
+    
+    Key arguments:
+    task -- the job id, graph name and load and the job's arguments.
+    """
+    id, name, load, v, t, options, metrics = task
+    
+    if not name in resident or resident[name][0] != load:
+        # Let the old graph go before building the new one.
+        resident.pop(name, None)
+        resident[name] = (load, Graph.factory(sources[load]))
+    graph = resident[name][1]
+    
+    n = float(len(graph.nodes))
+    iterations = [0]
+    
+    def update(result, remaining):
+        if id in cancels:
+            raise BridgeCutException('Job cancelled.')
+        
+        iterations[0] += 1
+        progress[id] = (iterations[0], 1.0 - remaining / n)
+    
+    try:
+        bc = BridgeCut.factory(v, graph)
+        results, clusters = bc.execute(t, *options, **{'callback': update})
+        
+        davies_bouldin = None
+        silhouette = None
+        if metrics:
+            davies_bouldin = BridgeCut.davies_bouldin(graph, clusters)
+            silhouette = BridgeCut.silhouette(graph, clusters)
+        
+        results = [(str(result[0]), result[1], result[2], result[3]) for result in results]
+        clusters = [[node.value for node in cluster.nodes] for cluster in clusters]
+        return Job.DONE, (results, clusters, davies_bouldin, silhouette), iterations[0]
+    except Exception:
+        if id in cancels:
+            return Job.CANCELLED, None, iterations[0]
+        return Job.FAILED, str(sys.exc_info()[1]), iterations[0]
+
+def share(shared_sources, shared_progress, shared_cancels):
+    """
+    Keeps what a worker process shares with the service.
+    
+    Key arguments:
+    shared_sources  -- the edge list of each load still in use.
+    shared_progress -- iterations and progress of each running job.
+    shared_cancels  -- ids of the jobs cancelled while running.
+    """
+    global sources, progress, cancels
+    sources = shared_sources
+    progress = shared_progress
+    cancels = shared_cancels
+
+class Job(object):
+    
+    # Job states.
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    CANCELLED = 'cancelled'
+    FAILED = 'failed'
+    
+    def __init__(self, id, name, load, v, t, early=False, size=1, cuts=0, secs=0, metrics=True):
+        """
+        Init.
+        
+        Key arguments:
+        id      -- the job id.
+        name    -- name of the graph.
+        load    -- which load of the graph, see Service.load.
+        v       -- the version.
+        t       -- density threshold
+        early   -- early termination mode. [optional]
+        size    -- largest component accepted without cutting in early termination mode. [optional]
+        cuts    -- maximum number of cuts, 0 for no limit. [optional]
+        secs    -- maximum seconds spent cutting, 0 for no limit. [optional]
+        metrics -- whether to find the DB index and silhouette. [optional]
+        """
+        self.id = id
+        self.name = name
+        self.load = load
+        self.v = v
+        self.t = t
+        self.options = (early, size, cuts, secs)
+        self.metrics = metrics
+        
+        # Guards the state, so a job is either cancelled or started.
+        self.lock = threading.Lock()
+        self.state = self.QUEUED
+        self.cancelled = False
+        self.iterations = 0
+        self.progress = 0.0
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        
+        self.error = None
+        self.results = None
+        self.clusters = None
+        self.davies_bouldin = None
+        self.silhouette = None
+    
+    def cancel(self, cancels):
+        """
+        Cancels the job.
+        
+        A queued job never starts, a running one stops after its
+        current iteration.
+        
+        Key arguments:
+        cancels -- ids of the jobs cancelled while running, shared with the workers.
+        """
+        self.lock.acquire()
+        try:
+            self.cancelled = True
+            if self.state == self.QUEUED:
+                self.state = self.CANCELLED
+                self.finished = time.time()
+            elif self.state == self.RUNNING:
+                cancels[self.id] = True
+        finally:
+            self.lock.release()
+    
+    def run(self, pool):
+        """
+        Runs the job on a worker process and waits for it.
+        
+        Key arguments:
+        pool -- the worker processes.
+        """
+        self.lock.acquire()
+        try:
+            if self.cancelled:
+                return
+            
+            self.state = self.RUNNING
+            self.started = time.time()
+        finally:
+            self.lock.release()
+        
+        try:
+            state, outcome, iterations = pool.apply(cluster, ((self.id, self.name, self.load, self.v, self.t,
+                                                               self.options, self.metrics),))
+        except Exception:
+            state, outcome, iterations = self.FAILED, str(sys.exc_info()[1]), self.iterations
+        
+        self.lock.acquire()
+        try:
+            self.iterations = iterations
+            if state == self.DONE:
+                self.results, self.clusters, self.davies_bouldin, self.silhouette = outcome
+                self.progress = 1.0
+            elif state == self.FAILED:
+                self.error = outcome
+            
+            self.state = state
+            self.finished = time.time()
+        finally:
+            self.lock.release()
+    
+    def status(self):
+        """
+        Returns the status of the job as a dictionary.
+        """
+        ret = {
+               'id': self.id,
+               'graph': self.name,
+               'version': self.v,
+               'threshold': self.t,
+               'state': self.state,
+               'iterations': self.iterations,
+               'progress': self.progress,
+               'created': self.created,
+               'started': self.started,
+               'finished': self.finished,
+               }
+        
+        if self.state == self.FAILED:
+            ret['error'] = self.error
+        
+        if self.state == self.DONE:
+            ret['results'] = self.results
+            ret['clusters'] = self.clusters
+            
+            # JSON has no infinity or NaN, an undefined metric is null.
+            for key, value in (('davies_bouldin', self.davies_bouldin), ('silhouette', self.silhouette)):
+                if value != None and (value != value or value in (float('inf'), float('-inf'))):
+                    value = None
+                ret[key] = value
+        
+        return ret
+
+class Service(object):
+    
+    def __init__(self, workers=2, queue=100, keep=1000):
+        """
+        Init.
+        
+        Graphs stay loaded for the lifetime of the service, so jobs only
+        pay for the clustering itself.  Jobs wait in a bounded queue and
+        are handed by a thread each to a fixed pool of worker processes,
+        like batch.py, so they run in parallel.  The edge list of each
+        load is kept once by a manager process, and a worker builds a
+        graph the first time a job needs it and keeps it until the graph
+        is loaded again under the same name, so jobs only send the name.
+        Progress and cancellation pass through the manager as well.
+        
+        Key arguments:
+        workers -- the number of worker processes. [optional]
+        queue   -- the most jobs waiting to run. [optional]
+        keep    -- the most jobs remembered. [optional]
+        """
+        self.graphs = {}
+        self.loaded = {}
+        self.pending = {}
+        self.jobs = {}
+        self.keep = keep
+        self.lock = threading.Lock()
+        self.queue = Queue.Queue(queue)
+        self.next = 1
+        self.loads = 0
+        
+        # Start the processes before any thread, so none is forked along.
+        self.manager = multiprocessing.Manager()
+        self.sources = self.manager.dict()
+        self.progress = self.manager.dict()
+        self.cancels = self.manager.dict()
+        self.pool = multiprocessing.Pool(workers, share, (self.sources, self.progress, self.cancels))
+        
+        self.workers = []
+        for i in range(workers):
+            worker = threading.Thread(target=self.work)
+            worker.setDaemon(True)
+            worker.start()
+            self.workers.append(worker)
+    
+    def cancel(self, id):
+        """
+        Cancels a job.
+        
+        Key arguments:
+        id -- the job id.
+        """
+        job = self.job(id)
+        
+        # A running job finds out in its worker process.
+        job.cancel(self.cancels)
+        
+        return job
+    
+    def job(self, id):
+        """
+        Returns a job.
+        
+        Key arguments:
+        id -- the job id.
+        """
+        try:
+            job = self.jobs[id]
+        except KeyError:
+            raise BridgeCutException('Job Not Found.')
+        
+        if job.state == Job.RUNNING:
+            job.iterations, job.progress = self.progress.get(id, (job.iterations, job.progress))
+        
+        return job
+    
+    def load(self, name, items):
+        """
+        Loads a graph and keeps it resident, returns its size.
+        
+        Only the edge list is kept here, the graph itself is built by the
+        workers that run its jobs.
+        
+        Key arguments:
+        name  -- name of the graph.
+        items -- the items to parse.
+        """
+        values = set()
+        edges = set()
+        for value1, value2 in items:
+            values.add(value1)
+            values.add(value2)
+            edges.add((min(value1, value2), max(value1, value2)))
+        size = {'nodes': len(values), 'edges': len(edges)}
+        
+        self.lock.acquire()
+        try:
+            self.loads += 1
+            self.sources[self.loads] = items
+            
+            old = self.loaded.get(name)
+            self.graphs[name] = size
+            self.loaded[name] = self.loads
+            if old:
+                self.release(old)
+        finally:
+            self.lock.release()
+        
+        return size
+    
+    def release(self, load):
+        """
+        Drops the edge list of a load once no graph or job uses it, the
+        lock must be held.
+        
+        Key arguments:
+        load -- the load.
+        """
+        if not self.pending.get(load) and not load in self.loaded.values():
+            self.sources.pop(load, None)
+    
+    def submit(self, name, v, t, **options):
+        """
+        Queues a clustering job and returns it.
+        
+        Key arguments:
+        name    -- name of the graph.
+        v       -- the version.
+        t       -- density threshold
+        options -- the other options of the job.
+        """
+        if not v in BridgeCut.VERSIONS:
+            raise BridgeCutException('Version Not Implemented.')
+        
+        self.lock.acquire()
+        try:
+            try:
+                load = self.loaded[name]
+            except KeyError:
+                raise BridgeCutException('Graph Not Found.')
+            
+            job = Job(self.next, name, load, v, t, **options)
+            
+            try:
+                self.queue.put_nowait(job)
+            except Queue.Full:
+                raise BridgeCutException('Queue Full.')
+            
+            self.pending[load] = self.pending.get(load, 0) + 1
+            self.jobs[job.id] = job
+            self.next += 1
+            
+            # Forget the oldest finished jobs.
+            if len(self.jobs) > self.keep:
+                for id in sorted(self.jobs):
+                    if len(self.jobs) <= self.keep:
+                        break
+                    if self.jobs[id].finished:
+                        del self.jobs[id]
+        finally:
+            self.lock.release()
+        
+        return job
+    
+    def unload(self, name):
+        """
+        Unloads a graph.
+        
+        Jobs already queued on it still run.
+        
+        Key arguments:
+        name -- name of the graph.
+        """
+        self.lock.acquire()
+        try:
+            try:
+                del self.graphs[name]
+                load = self.loaded.pop(name)
+            except KeyError:
+                raise BridgeCutException('Graph Not Found.')
+            
+            self.release(load)
+        finally:
+            self.lock.release()
+    
+    def work(self):
+        """
+        Worker loop, runs queued jobs forever.
+        """
+        while True:
+            job = self.queue.get()
+            job.run(self.pool)
+            
+            self.progress.pop(job.id, None)
+            self.cancels.pop(job.id, None)
+            
+            self.lock.acquire()
+            try:
+                self.pending[job.load] -= 1
+                if not self.pending[job.load]:
+                    del self.pending[job.load]
+                self.release(job.load)
+            finally:
+                self.lock.release()
@@ -0,0 +1,144 @@
+"""
+Clustering of a graph that keeps changing.
+
+@package bridgecut
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+from core import BridgeCut
+
+class Stream(object):
+    
+    def __init__(self, graph, v, t, **options):
+        """
+        Init.
+        
+        The whole graph is clustered once.  After that, every update only
+        cuts again the clusters it touches: clusters joined by a new edge
+        are cut together, and a cluster that lost an edge is cut again
+        only if it fell apart or is no longer denser than the threshold.
+        A new edge inside a cluster only makes it denser, and a lost edge
+        between clusters changes neither, so both are left alone.
+        
+        Key arguments:
+        graph   -- the graph, updated in place.
+        v       -- the version.
+        t       -- density threshold
+        options -- the other arguments of execute. [optional]
+        """
+        self.graph = graph
+        self.v = v
+        self.t = t
+        self.options = options
+        
+        # Values of each cluster's nodes by cluster id, and the reverse.
+        self.members = {}
+        self.owners = {}
+        self.next = 0
+        
+        # Values of the nodes left out of every cluster, such as cut vertices.
+        self.loose = set()
+        
+        self.results = self.run(graph.values)
+    
+    def clusters(self):
+        """
+        Returns the current clusters.
+        """
+        return [self.graph.subgraph(self.members[id]) for id in sorted(self.members)]
+    
+    def find(self, parents, id):
+        """
+        Returns the cluster a cluster was joined to.
+        
+        Key arguments:
+        parents -- the cluster each cluster was joined to.
+        id      -- the cluster id.
+        """
+        while parents.get(id, id) != id:
+            id = parents[id] = parents.get(parents[id], parents[id])
+        return id
+    
+    def run(self, values):
+        """
+        Clusters some nodes of the graph and keeps their clusters.
+        
+        Returns the results of the execution.
+        
+        Key arguments:
+        values -- values of the nodes.
+        """
+        bc = BridgeCut.factory(self.v, self.graph.subgraph(values))
+        results, clusters = bc.execute(self.t, **self.options)
+        
+        self.loose.update(values)
+        for cluster in clusters:
+            self.members[self.next] = set(cluster.values)
+            for value in cluster.values:
+                self.owners[value] = self.next
+            self.loose.difference_update(cluster.values)
+            self.next += 1
+        
+        for value in self.loose:
+            self.owners.pop(value, None)
+        
+        return results
+    
+    def update(self, added=(), removed=()):
+        """
+        Adds and removes edges, then clusters again what they touched.
+        
+        Returns the results of the executions and the new clusters.
+        
+        Key arguments:
+        added   -- the (value1, value2) edges to add. [optional]
+        removed -- the (value1, value2) edges to remove. [optional]
+        """
+        parents = {}
+        checks = set()
+        
+        for value1, value2 in removed:
+            id = self.owners.get(value1)
+            if self.graph.unlink(value1, value2) and id != None and id == self.owners.get(value2):
+                checks.add(id)
+        
+        for value1, value2 in added:
+            if not self.graph.link(value1, value2):
+                continue
+            
+            # New and loose nodes start on their own.
+            for value in (value1, value2):
+                if not value in self.owners:
+                    self.members[self.next] = set([value])
+                    self.owners[value] = self.next
+                    self.loose.discard(value)
+                    self.next += 1
+            
+            id1 = self.find(parents, self.owners[value1])
+            id2 = self.find(parents, self.owners[value2])
+            if id1 != id2:
+                parents[max(id1, id2)] = min(id1, id2)
+                parents.setdefault(min(id1, id2), min(id1, id2))
+        
+        # Clusters that lost an edge only need cutting if they got worse.
+        for id in checks:
+            if id in parents:
+                continue
+            cluster = self.graph.subgraph(self.members[id])
+            if len(cluster.components()) > 1 or cluster.density() <= self.t:
+                parents[id] = id
+        
+        regions = {}
+        for id in parents:
+            regions.setdefault(self.find(parents, id), []).append(id)
+        
+        results = []
+        start = self.next
+        for root in sorted(regions):
+            values = []
+            for id in regions[root]:
+                values.extend(self.members.pop(id))
+            results.extend(self.run(values))
+        
+        return results, [self.graph.subgraph(self.members[id]) for id in range(start, self.next)]
@@ -15,7 +15,7 @@ class EdgeBBridgeCut(BridgeCut):
         @see parent
         """
         # Get all the shortest paths.
-        paths = graph.paths()
+        paths = graph.paths(self.engine)
         edges = graph.edges()
         
         btwns_ranks = self.ranks(paths, edges, lambda edge: edge.btwns(paths))
@@ -30,7 +30,8 @@ class EdgeBBridgeCut(BridgeCut):
                 max_score = score
                 max_edge = edge
         
+        # No edges left, remove a node on its own.
         if not max_edge:
-            return None, None, graph.nodes[0]
+            return graph.nodes[0], None, []
         
         return max_edge, max_score, max_edge.destroy()
\ No newline at end of file
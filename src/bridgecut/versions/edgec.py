@@ -15,11 +15,12 @@ class EdgeCBridgeCut(BridgeCut):
         @see parent
         """
         # Get all the shortest paths.
-        paths = graph.paths()
+        paths = graph.paths(self.engine)
         edges = graph.edges()
+        adj = graph.adjacency()
         
         btwns_ranks = self.ranks(paths, edges, lambda edge: edge.btwns(paths))
-        bridge_ranks = self.ranks(paths, edges, lambda edge: edge.bridge_coeff())
+        bridge_ranks = self.ranks(paths, edges, lambda edge: edge.bridge_coeff(adj))
 
         max_score = 0.0
         max_edge = None
@@ -31,7 +32,8 @@ class EdgeCBridgeCut(BridgeCut):
                 max_score = score
                 max_edge = edge
         
+        # No edges left, remove a node on its own.
         if not max_edge:
-            return None, None, graph.nodes[0]
+            return graph.nodes[0], None, []
         
         return max_edge, max_score, max_edge.destroy()
\ No newline at end of file
@@ -15,7 +15,7 @@ class VertexBBridgeCut(BridgeCut):
         @see parent
         """
         # Get all the shortest paths.
-        paths = graph.paths()
+        paths = graph.paths(self.engine)
         nodes = graph.nodes
         
         btwns_ranks = self.ranks(paths, nodes, lambda node: node.btwns(paths))
@@ -15,11 +15,12 @@ class VertexCBridgeCut(BridgeCut):
         @see parent
         """
         # Get all the shortest paths.
-        paths = graph.paths()
+        paths = graph.paths(self.engine)
         nodes = graph.nodes
+        adj = graph.adjacency()
         
         btwns_ranks = self.ranks(paths, nodes, lambda node: node.btwns(paths))
-        bridge_ranks = self.ranks(paths, nodes, lambda node: node.bridge_coeff())
+        bridge_ranks = self.ranks(paths, nodes, lambda node: node.bridge_coeff(adj))
         
         max_score = 0.0
         max_node = None
@@ -3,10 +3,13 @@
 @copyright 2011 Aaron Zampaglione
 @license MIT
 """
-VERSIONS = {'edge-c': '../results/enron/enron2-edge-c-0.6.txt',
-           'edge-b': '../results/enron/enron2-edge-b-0.6.txt',
-           'vertex-c': '../results/enron/enron2-vertex-c-0.6.txt',
-           'vertex-b': '../results/enron/enron2-vertex-b-0.6.txt',
+from bridgecut.record import Record
+
+# Records written by sensitivity.py.
+VERSIONS = {'edge-c': '../results/enron/enron2-edge-c-0.6.bcr',
+           'edge-b': '../results/enron/enron2-edge-b-0.6.bcr',
+           'vertex-c': '../results/enron/enron2-vertex-c-0.6.bcr',
+           'vertex-b': '../results/enron/enron2-vertex-b-0.6.bcr',
             }
 
 NUM_NODES = 100
@@ -17,21 +20,16 @@ results = {'edge-c': {},
            'vertex-b': {},
            }
 
-for version, file_name in VERSIONS.iteritems():
+versions = dict([(file_name, version) for version, file_name in VERSIONS.iteritems()])
+
+for file_name, (removed, coeffs) in Record.scan(versions, 'removed', 'coeff'):
+    version = versions[file_name]
     nodes = 0.0
-    handle = open(file_name, 'r')
-    for line in handle:
-        line = line.rsplit('-', 3)
-        if len(line) != 4:
-            continue
-        try:
-            nodes += float(line[2].replace('\t', ''))
-        except:
-            continue
+    for i in range(len(removed)):
+        nodes += removed[i]
         p = str(nodes / NUM_NODES) 
         if not p in results[version]:
-            results[version][p] = line[3][:-1].replace('\t', '')
-    handle.close()
+            results[version][p] = str(coeffs[i])
 
 for version, result in results.iteritems():
     print(version)
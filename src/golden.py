@@ -0,0 +1,342 @@
+"""
+Golden output harness for Bridge Cut.
+
+Every run of the shell scripts (toy-*.sh, mine.sh, enron5.sh), and with
+-a the enron2 sensitivity runs, is repeated with the reference engine
+and every alternate engine asked for.  The cut order, scores, nodes removed,
+clustering coefficients, clusters and metrics of each engine are checked
+against the reference run, and the reference run against the output
+shipped in results/.  With -n, local runs around a few seeds are
+checked against the clusters of main.py's engine (paths) too, and
+with -x the clusters of a run on the graph with its pendant trees
+folded (as main.py -x does).  One line is written per run:
+    
+    run, golden, engine: agreement speedup..., local: agreement by halo, reduced: agreement
+
+A golden column of "ok" means the shipped output is reproduced, anything
+else names the parts that differ.  The program fails when an alternate
+engine disagrees with the reference, when a local run covering a
+seed's whole component doesn't give back the seed's cluster, or when
+the reduced run gives other clusters.
+
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+from bridgecut.core import BridgeCut
+from bridgecut.graph.core import Graph
+from bridgecut.graph.reduction import Reduction
+
+import getopt
+import glob
+import os
+import shlex
+import sys
+import time
+
+# Engines finding the shortest paths and betweenness.
+ENGINES = {
+           'counts': (['bridgecut', 'graph', 'counts'], 'Counts'), # Subtree pass per source, no trees kept.
+           'paths': (['bridgecut', 'graph', 'paths'], 'Paths'), # BFS trees and a subtree pass.
+           'routes': (['bridgecut', 'graph', 'routes'], 'Routes'), # Every route counted on its own.
+           }
+
+# Engines run when none are asked for.  Ranks compare scores exactly, and
+#  the subtree passes sum in another order than routes, so they can rank
+#  scores that are equal up to rounding differently and cut in another
+#  order; such runs are reported as failing.
+DEFAULT = ['counts', 'paths', 'routes']
+
+# The engine every other one is checked against, counting every shortest
+#  route of every pair as the original implementation did.
+REFERENCE = 'routes'
+
+# Seeds of each run checked with -n, spread evenly over the graph, and
+#  the hops and halos of the local runs reported next to the exact check
+#  (main.py's default hops, and halos around its default).
+SEEDS = 5
+HOPS = 2
+HALOS = [1, 2, 3]
+
+def cases(sensitivity):
+    """
+    Returns the input, golden output, version and threshold of every run.
+    
+    Key arguments:
+    sensitivity -- whether to add the enron2 sensitivity runs.
+    """
+    ret = []
+    
+    for script in sorted(glob.glob('*.sh')):
+        for line in open(script, 'r'):
+            args = shlex.split(line)
+            if args[:2] != ['python', 'main.py']:
+                continue
+            opts = dict(getopt.getopt(args[2:], "i:o:v:t:")[0])
+            ret.append((opts['-i'], opts['-o'], opts['-v'], opts['-t']))
+    
+    if sensitivity:
+        for name in sorted(glob.glob('../results/enron/enron2-*.txt')):
+            v, t = os.path.basename(name)[len('enron2-'):-len('.txt')].rsplit('-', 1)
+            ret.append(('../data/enron/enron2.txt', name, v, t))
+    
+    return ret
+
+def close(value1, value2, tol):
+    """
+    Returns whether two numbers are equal within a tolerance.
+    
+    Key arguments:
+    value1 -- value1.
+    value2 -- value2.
+    tol    -- the relative tolerance.
+    """
+    if value1 == value2:
+        return True
+    
+    return abs(value1 - value2) <= tol * max(1.0, abs(value1), abs(value2))
+
+def compare(run1, run2, tol):
+    """
+    Returns the parts of two runs that differ.
+    
+    Key arguments:
+    run1 -- run1.
+    run2 -- run2.
+    tol  -- the relative tolerance of the numbers.
+    """
+    cuts1, clusters1, metrics1 = run1
+    cuts2, clusters2, metrics2 = run2
+    
+    ret = []
+    
+    if [cut[0] for cut in cuts1] != [cut[0] for cut in cuts2]:
+        ret.append('cuts')
+    elif [cut[1] for cut in cuts1] != [cut[1] for cut in cuts2]:
+        ret.append('scores')
+    elif [cut[2] for cut in cuts1] != [cut[2] for cut in cuts2]:
+        ret.append('removed')
+    elif [cut1[3] for cut1, cut2 in zip(cuts1, cuts2) if not close(cut1[3], cut2[3], tol)]:
+        ret.append('coeffs')
+    
+    if clusters1 != clusters2:
+        ret.append('clusters')
+    
+    if not close(metrics1[0], metrics2[0], tol):
+        ret.append('db')
+    
+    if not close(metrics1[1], metrics2[1], tol):
+        ret.append('silhouette')
+    
+    return ret
+
+def engine(name):
+    """
+    Returns the class of an engine.
+    
+    Key arguments:
+    name -- name of the engine.
+    """
+    module = __import__('.'.join(ENGINES[name][0]), globals(), {}, [ENGINES[name][1]])
+    return getattr(module, ENGINES[name][1])
+
+def execute(paths, items, v, t):
+    """
+    Runs a version with an engine, returns the cuts, clusters and metrics.
+    
+    Key arguments:
+    paths -- the engine.
+    items -- the edges of the graph.
+    v     -- the version.
+    t     -- the density threshold.
+    """
+    graph = Graph.factory(items)
+    results, clusters = BridgeCut.factory(v, graph, paths).execute(t)
+    
+    metrics = (BridgeCut.davies_bouldin(graph, clusters), BridgeCut.silhouette(graph, clusters))
+    
+    cuts = [(str(result[0]), str(result[1]), result[2], result[3]) for result in results]
+    clusters = sorted([sorted([node.value for node in cluster.nodes]) for cluster in clusters])
+    
+    return cuts, clusters, metrics
+
+def golden(name):
+    """
+    Reads a run from a shipped output file.
+    
+    Key arguments:
+    name -- the output file.
+    """
+    lines = open(name, 'r').read().replace('\r', '').split('\n')
+    
+    cuts = []
+    clusters = []
+    metrics = {}
+    
+    section = None
+    for line in lines:
+        if line.startswith('Top Items Removed:'):
+            section = 'cuts'
+        elif line.startswith('Clusters:'):
+            section = 'clusters'
+        elif line.startswith('DB Index:') or line.startswith('Average Silhouette Coefficient:'):
+            metrics[line.split(':')[0]] = float(line.split(':')[1].strip())
+        elif section == 'cuts' and '\t-\t' in line and not line.startswith('\t#'):
+            item, score, removed, coeff = line.split('\t-\t')
+            cuts.append((item.split('\t', 2)[2], score, int(removed), float(coeff)))
+        elif section == 'clusters' and line.startswith('\t'):
+            clusters.append(sorted(line.strip().split(', ')))
+    
+    return cuts, sorted(clusters), (metrics['DB Index'], metrics['Average Silhouette Coefficient'])
+
+def local(items, v, t, clusters, k=None, halo=2):
+    """
+    Returns how many seeds a local run gives their cluster of the whole
+    run, and how many seeds there were.
+    
+    Without hops the neighborhood is the seed's whole component, so the
+    local run must give back exactly the seed's cluster.  With fewer
+    hops the betweenness only sees part of the graph and may differ.
+    
+    Key arguments:
+    items    -- the edges of the graph.
+    v        -- the version.
+    t        -- the density threshold.
+    clusters -- the clusters of the whole run, as sorted values.
+    k        -- hops around the seed, None for the whole component. [optional]
+    halo     -- extra hops kept beyond k. [optional]
+    """
+    graph = Graph.factory(items)
+    if k == None:
+        k = len(graph.nodes)
+    
+    seeds = BridgeCut.spread(graph, SEEDS)
+    
+    ret = 0
+    for seed in seeds:
+        _, found = BridgeCut.factory(v, graph).local([seed.value], k, t, halo)
+        owner = [cluster for cluster in clusters if seed.value in cluster]
+        if [sorted(cluster.values) for cluster in found] == owner:
+            ret += 1
+    
+    return ret, len(seeds)
+
+def reduced(items, v, t):
+    """
+    Returns the clusters of a run on the graph with its pendant trees
+    folded, as sorted values.
+    
+    Key arguments:
+    items -- the edges of the graph.
+    v     -- the version.
+    t     -- the density threshold.
+    """
+    reduction = Reduction(Graph.factory(items), chains=False)
+    _, clusters = BridgeCut.factory(v, reduction.graph).execute(t)
+    
+    return sorted([sorted(cluster.values) for cluster in reduction.expand(clusters)])
+
+def main():
+    """Main execution method."""
+    # Determine command line arguments.
+    try:
+        rawopts, _ = getopt.getopt(sys.argv[1:], "e:r:at:nx")
+    except getopt.GetoptError:
+        usage()
+        sys.exit(2)
+    
+    opts = {}
+    
+    # Process each command line argument.
+    for o, a in rawopts:
+        opts[o[1]] = a
+    
+    # Make sure the engines exist.
+    names = opts.get('e', ','.join(DEFAULT)).split(',')
+    for name in names:
+        if not name in ENGINES:
+            usage()
+            sys.exit(2)
+    
+    # The reference always runs, and first.
+    names = [REFERENCE] + [name for name in names if name != REFERENCE]
+    
+    tol = float(opts.get('t', 1e-9))
+    repeat = int(opts.get('r', 1))
+    
+    failed = False
+    for source, output, v, t in cases('a' in opts):
+        items = [line.replace('\t', ' ').replace('\n', '').replace('\r', '').split(' ') for line in open(source, 'r')]
+        items = [item[:2] for item in items if len(item) >= 2]
+        
+        line = [os.path.basename(output)]
+        
+        reference = None
+        runs = {}
+        for name in names:
+            run, secs = None, float('inf')
+            for _ in range(repeat):
+                start = time.time()
+                run = execute(engine(name), items, v, float(t))
+                secs = min(secs, time.time() - start)
+            runs[name] = run
+            
+            if name == REFERENCE:
+                reference = run, secs
+                
+                if os.path.exists(output):
+                    diffs = compare(golden(output), run, tol)
+                else:
+                    diffs = ['missing']
+                line.append(diffs and ','.join(diffs) or 'ok')
+                line.append('%s: %.3fs' % (name, secs))
+            else:
+                diffs = compare(reference[0], run, tol)
+                if diffs:
+                    failed = True
+                line.append('%s: %s %.2fx' % (name, diffs and ','.join(diffs) or 'ok', reference[1] / secs))
+        
+        # Local and reduced runs use main.py's engine, so they are checked
+        #  against its clusters.
+        if ('n' in opts or 'x' in opts) and not 'paths' in runs:
+            runs['paths'] = execute(Graph.PATHS, items, v, float(t))
+        
+        if 'n' in opts:
+            whole, seeds = local(items, v, float(t), runs['paths'][1])
+            if whole < seeds:
+                failed = True
+            
+            near = []
+            for halo in HALOS:
+                near.append('halo %d %d/%d' % (halo, local(items, v, float(t), runs['paths'][1], HOPS, halo)[0], seeds))
+            line.append('local: %d/%d, %d hops: %s' % (whole, seeds, HOPS, ', '.join(near)))
+        
+        if 'x' in opts:
+            same = reduced(items, v, float(t)) == runs['paths'][1]
+            if not same:
+                failed = True
+            line.append('reduced: %s' % (same and 'ok' or 'clusters'))
+        
+        print('\t'.join(line))
+    
+    if failed:
+        sys.exit(1)
+
+def usage():
+    """Prints the usage of the program."""
+    print("\n" +
+          "The following arguments are optional:\n" +
+          "-e: the engines, comma separated (" + ", ".join(sorted(ENGINES)) + ", default " + ", ".join(DEFAULT) + ").\n" +
+          "-a: add the enron2 sensitivity runs.\n" +
+          "-t: the relative tolerance of the numbers (default 1e-9).\n" +
+          "-r: runs of each engine, the fastest is timed (default 1).\n" +
+          "-n: check local runs around " + str(SEEDS) + " seeds of each graph against the paths run.\n" +
+          "-x: check the clusters of runs with pendant trees folded against the paths run.\n" +
+          "\n" +
+          "Example Usage:\n" +
+          "python golden.py -e \"paths\" -r 3" +
+          "\n")
+
+"""Main execution."""
+if __name__ == "__main__":
+    main()
@@ -16,17 +16,26 @@ The style guide follows the strict python PEP 8 guidelines.
 @copyright 2011 Aaron Zampaglione
 @license MIT
 """
+from bridgecut.cache import Cache
 from bridgecut.core import BridgeCut
+from bridgecut.dendrogram import Dendrogram
+from bridgecut.disk import DiskBridgeCut
+from bridgecut.memory import Memory
+from bridgecut.record import Record
 from bridgecut.graph.core import Graph
+from bridgecut.graph.disk import DiskGraph
+from bridgecut.graph.store import Store
+from bridgecut.graph.reduction import Reduction
 
 import getopt
+import os
 import sys
 
 def main():
     """Main execution method."""
     # Determine command line arguments.
     try:
-        rawopts, _ = getopt.getopt(sys.argv[1:], "i:o:v:t:")
+        rawopts, _ = getopt.getopt(sys.argv[1:], "i:o:v:t:es:c:l:k:n:r:a:xg:jb:m:w:d:")
     except getopt.GetoptError:
         usage()
         sys.exit(2)
@@ -38,32 +47,173 @@ def main():
         opts[o[1]] = a
     
     # The following arguments are required in all cases.
-    for opt in ['i', 'o', 'v', 't']:
+    for opt in ['i', 'v', 't']:
         if not opt in opts:
             usage()
             sys.exit(2)
     
+    # Somewhere to write the run.
+    if not 'o' in opts and not 'b' in opts:
+        usage()
+        sys.exit(2)
+    
     # Make sure the version exists.
     if not opts['v'] in BridgeCut.VERSIONS:
         usage()
         sys.exit(2)
     
+    # Seeds, if given, can't be empty.
+    seeds = [value for value in opts.get('n', '').split(',') if value]
+    if 'n' in opts and not seeds:
+        usage()
+        sys.exit(2)
+    
+    # Seeds and coarsening don't mix, with each other or a dendrogram.
+    if ('n' in opts and 'g' in opts) or ('w' in opts and ('n' in opts or 'g' in opts)):
+        usage()
+        sys.exit(2)
+    
+    # The store only runs the plain cut.
+    if 'd' in opts and [opt for opt in 'knxgmw' if opt in opts]:
+        usage()
+        sys.exit(2)
+    
     # Some people like spaces, other like tabs, some like \r\n, other like \n... etc.
     #  I personally think Dr. Chan can't make up his mind!
     #  and I'm also to lazy to use REGEX for this.
-    items = [line.replace('\t', ' ').replace('\n', '').replace('\r', '').split(' ') for line in open(opts['i'], 'r')]
-    while len(items[-1]) < 2:
-        items.pop()
+    items = None
+    if not 'd' in opts:
+        items = [line.replace('\t', ' ').replace('\n', '').replace('\r', '').split(' ') for line in open(opts['i'], 'r')]
+        while len(items[-1]) < 2:
+            items.pop()
+    
+    # Early termination and caps are optional.
+    early = 'e' in opts
+    size = int(opts.get('s', 1))
+    cuts = int(opts.get('c', 0))
+    secs = float(opts.get('l', 0))
+    
+    # Look the run up in the cache first.  A run stopped by the clock
+    #  depends on the machine and its load, so it is never cached.
+    cache = None
+    entry = None
+    if 'k' in opts and not secs:
+        cache = Cache(opts['k'])
+        key = Cache.key(items, opts['v'], opts['t'], early, size, cuts, secs, opts.get('n'), opts.get('r'), opts.get('a'), 'x' in opts,
+                        opts.get('g'), 'j' in opts, opts.get('m'))
+        
+        # The dendrogram needs the run itself.
+        if not 'w' in opts:
+            entry = cache.get(key)
     
-    # Make a graph.
-    graph = Graph.factory(items)
+    if not entry:
+        # Make a graph, or read it from the store, built on first use.
+        if 'd' in opts:
+            if not os.path.exists(os.path.join(opts['d'], Store.MATES)):
+                Store.factory(opts['i'], opts['d']).close()
+            graph = DiskGraph.load(opts['d'])
+        else:
+            graph = Graph.factory(items)
+        
+        # Every seed must be in the graph.
+        missing = [value for value in seeds if not graph.node(value)]
+        if missing:
+            print('Seeds not found: ' + ', '.join(missing))
+            sys.exit(2)
+        
+        # Account for memory and stay within the budget if given, in MB.
+        memory = None
+        engine = None
+        callback = None
+        sample = 0
+        if 'm' in opts:
+            budget = float(opts['m']) * 1048576
+            engine = Memory.engine(len(graph.nodes), len(graph.edges()), budget)
+            
+            memory = Memory()
+            memory.track('graph')
+            callback = lambda result, n: memory.track('split ' + str(len(memory.phases)))
+        
+        # Cut the reduced graph if asked to.
+        reduction = None
+        if 'x' in opts:
+            reduction = Reduction(graph, chains=False)
+        
+        # Execution of the specific version, around the seeds only if given.
+        if 'd' in opts:
+            bc = DiskBridgeCut(graph, opts['v'])
+        else:
+            bc = BridgeCut.factory(opts['v'], reduction and reduction.graph or graph, engine)
+        if 'n' in opts:
+            owners = seeds
+            if reduction:
+                owners = [reduction.owner(value) for value in seeds]
+            
+            results, clusters = bc.local(owners, int(opts.get('r', 2)), float(opts['t']), int(opts.get('a', 2)), True,
+                                         early=early, size=size, cuts=cuts, secs=secs, callback=callback)
+        elif 'g' in opts:
+            results, clusters = bc.multilevel(float(opts['t']), int(opts['g']), check='j' in opts,
+                                              early=early, size=size, cuts=cuts, secs=secs, callback=callback)
+        else:
+            tree = None
+            if 'w' in opts:
+                tree = Dendrogram(float(opts['t']))
+            
+            results, clusters = bc.execute(float(opts['t']), early, size, cuts, secs, callback, tree)
+            
+            if tree:
+                if reduction:
+                    tree.expand(reduction.members)
+                tree.save(opts['w'], opts['v'], opts['i'])
+        
+        if reduction:
+            clusters = reduction.expand(clusters)
+        
+        # The seed clusters are measured among every cluster of their
+        #  neighborhood, against the neighborhood itself.
+        measured = clusters
+        if 'n' in opts:
+            values = []
+            for cluster in clusters:
+                values.extend(cluster.values)
+            graph = graph.subgraph(values)
+            
+            clusters = [cluster for cluster in clusters if [value for value in seeds if cluster.node(value)]]
+        
+        # Performance measurements, sampled if they wouldn't fit.
+        if memory:
+            memory.track('cut')
+            sample = Memory.sample(len(graph.nodes), len(graph.edges()), len(measured), budget)
+        
+        davies_bouldin = BridgeCut.davies_bouldin(graph, measured, sample)
+        silhouette = BridgeCut.silhouette(graph, measured, sample)
+        
+        report = ''
+        if memory:
+            memory.track('metrics')
+            report = str(memory)
+        
+        # Only keep plain values, so the run can be cached.
+        results = [(str(result[0]), result[1], result[2], result[3]) for result in results]
+        clusters = [[node.value for node in cluster.nodes] for cluster in clusters]
+        entry = (results, clusters, davies_bouldin, silhouette, report)
+        
+        if cache:
+            cache.put(key, entry)
+    
+    results, clusters, davies_bouldin, silhouette, report = entry
     
-    # Execution of the specific version.
-    results, clusters = BridgeCut.factory(opts['v'], graph).execute(float(opts['t']))
+    # The record is what analysis scripts read.
+    if 'b' in opts:
+        Record.save(opts['b'], results, clusters, davies_bouldin, silhouette, opts['v'], opts['t'], opts['i'], report)
     
-    # Performance measurements.
-    davies_bouldin = BridgeCut.davies_bouldin(graph, clusters)
-    silhouette = BridgeCut.silhouette(graph, clusters)
+    # Print out performance measurements.
+    if report:
+        print(report)
+    print('\t'.join([str(davies_bouldin), str(silhouette)]))
+    
+    if not 'o' in opts:
+        return
     
     output = 'Top Items Removed:\n\n'
     output += '\t#\t-\tItem\t-\tRank\t-\tNodes Removed\t-\tClustering Coefficient\n\n'
@@ -73,30 +223,49 @@ def main():
         i += 1
     output += '\nClusters:\n\n'
     for cluster in clusters:
-        output += '\t' + str(cluster) + '\n'
+        output += '\t' + ', '.join(cluster) + '\n'
     
     output += '\n'
     output += 'DB Index:\t\t\t\t' + str(davies_bouldin) + '\n'
     output += 'Average Silhouette Coefficient:\t' + str(silhouette) + '\n'
     
+    if report:
+        output += '\nMemory:\n\n'
+        for line in report.split('\n'):
+            output += '\t' + line + '\n'
+    
     out = open(opts['o'], 'w')
     out.write(output)
     out.close()
-    
-    # Print out performance measurements for sensitivity analysis later.
-    print('\t'.join([str(davies_bouldin), str(silhouette)]))
 
 def usage():
     """Prints the usage of the program."""
     print("\n" + 
           "The following are arguments required:\n" + 
           "-i: the density threshold.\n" +
-          "-o: the output file.\n" +
+          "-o: the output file (or -b).\n" +
           "-v: the bridge cut version (" + ", ".join(BridgeCut.VERSIONS) + ").\n" + 
           "-t: the density threshold.\n" + 
           "\n" + 
+          "The following arguments are optional:\n" + 
+          "-e: early termination, accept small or dense components without cutting them.\n" + 
+          "-s: the largest component size accepted by early termination (default 1).\n" + 
+          "-c: the maximum number of cuts (default 0, no limit).\n" + 
+          "-l: the maximum number of seconds spent cutting (default 0, no limit).\n" + 
+          "-k: the result cache directory, repeated runs are read from it (not runs capped with -l).\n" + 
+          "-n: seed node values, comma separated, only their clusters are found.\n" + 
+          "-r: hops around the seeds clustered with -n (default 2).\n" + 
+          "-a: extra hops kept beyond -r, so routes near the boundary stay (default 2).\n" + 
+          "-x: fold pendant trees before cutting, the clusters may differ from a run without it (see golden.py -x).\n" + 
+          "-g: coarsen the graph to at most this many nodes, cut it and refine back (not with -n).\n" + 
+          "-j: keep a refinement only if it doesn't worsen both the silhouette and DB index (with -g).\n" + 
+          "-b: the record file, the run in columns for analysis scripts.\n" + 
+          "-m: memory budget in MB, print how much each phase raised the process high-water mark and use less memory to stay within it.\n" + 
+          "-w: the dendrogram file, the cuts of the run for any lower threshold (not with -n or -g).\n" + 
+          "-d: the store directory, the graph is read from disk while cutting, built from -i if missing (not with -k, -n, -x, -g, -m or -w).\n" + 
+          "\n" + 
           "Example Usage:\n" + 
-          "python main.py -i \"../data/toy/toy-bowtie.txt\" -o \"../results/toy/toy-bowtie.txt\" -d 0 -v \"edge-c\" -t .5" +
+          "python main.py -i \"../data/toy/toy-bowtie.txt\" -o \"../results/toy/toy-bowtie.txt\" -v \"edge-c\" -t .5" +
           "\n")
 
 """Main execution."""
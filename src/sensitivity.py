@@ -6,6 +6,8 @@ using the threshold parameters.
 @copyright 2011 Aaron Zampaglione
 @license MIT
 """
+from bridgecut.record import Record
+
 import commands
 
 results = {'edge-c': {},
@@ -18,18 +20,25 @@ start = 0
 stop = 1.01
 inc = 0.05
 
+# Points already computed are read from the result cache.
+cache = '../cache'
+
 while start <= stop:
     for version in results:
+        name = '../results/enron/enron2-' + str(version) + '-' + str(start)
         cmd = 'python main.py ' + \
               '-i "../data/enron/enron2.txt" ' + \
-              '-o "../results/enron/enron2-' + str(version) + \
-              '-' + str(start) + '.txt" ' + \
+              '-o "' + name + '.txt" ' + \
+              '-b "' + name + '.bcr" ' + \
               '-v ' + str(version) + ' ' + \
-              '-t ' + str(start)
+              '-t ' + str(start) + ' ' + \
+              '-k "' + cache + '"'
     
-        # Save our response
-        _, response = commands.getstatusoutput(cmd)
-        results[version][start] = commands.getstatusoutput(cmd)[1].split("\t")
+        # Save the metrics from the run's record.
+        commands.getstatusoutput(cmd)
+        record = Record(name + '.bcr')
+        results[version][start] = [str(record.value('db')), str(record.value('silhouette'))]
+        record.close()
     
     start += inc
 
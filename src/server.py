@@ -0,0 +1,209 @@
+"""
+Clustering service for Bridge Cut.
+
+Graphs are loaded once and stay in memory, clustering jobs are queued
+and run by a pool of worker processes.  Everything is spoken as JSON over HTTP:
+
+    GET    /graphs         -- the loaded graphs.
+    PUT    /graphs/<name>  -- load an edge list (the request body).
+    DELETE /graphs/<name>  -- unload a graph.
+    POST   /jobs           -- queue a job, the body is a JSON object with
+                              graph, version, threshold and optionally
+                              early, size, cuts, secs and metrics.
+    GET    /jobs/<id>      -- progress of a job, and its results once done.
+    DELETE /jobs/<id>      -- cancel a job.
+
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+from bridgecut.exception import BridgeCutException
+from bridgecut.service import Service
+
+import BaseHTTPServer
+import SocketServer
+import getopt
+import json
+import sys
+
+class Server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    
+    # Status codes of the service's errors, anything else is a bad request.
+    ERRORS = {
+              'Graph Not Found.': 404,
+              'Job Not Found.': 404,
+              'Queue Full.': 503,
+              }
+    
+    # Set before serving.
+    service = None
+    
+    def body(self):
+        """
+        Returns the request body.
+        """
+        return self.rfile.read(int(self.headers.getheader('Content-Length', 0)))
+    
+    def do_DELETE(self):
+        """
+        Unloads a graph or cancels a job.
+        """
+        path = self.path.strip('/').split('/')
+        try:
+            if len(path) == 2 and path[0] == 'graphs':
+                self.service.unload(path[1])
+                self.reply(200, {'graph': path[1]})
+            elif len(path) == 2 and path[0] == 'jobs':
+                self.reply(200, self.service.cancel(self.id(path[1])).status())
+            else:
+                self.reply(404, {'error': 'Not Found.'})
+        except BridgeCutException:
+            self.error()
+    
+    def do_GET(self):
+        """
+        Lists the graphs or returns a job.
+        """
+        path = self.path.strip('/').split('/')
+        try:
+            if path == ['graphs']:
+                self.reply(200, dict(self.service.graphs))
+            elif len(path) == 2 and path[0] == 'jobs':
+                self.reply(200, self.service.job(self.id(path[1])).status())
+            else:
+                self.reply(404, {'error': 'Not Found.'})
+        except BridgeCutException:
+            self.error()
+    
+    def do_POST(self):
+        """
+        Queues a job.
+        """
+        if self.path.strip('/') != 'jobs':
+            self.reply(404, {'error': 'Not Found.'})
+            return
+        
+        try:
+            try:
+                request = json.loads(self.body())
+                name = request.pop('graph')
+                v = request.pop('version')
+                t = float(request.pop('threshold'))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                raise BridgeCutException('Bad Job.')
+            
+            options = {}
+            for key, value in request.items():
+                options[str(key)] = value
+            
+            try:
+                job = self.service.submit(name, v, t, **options)
+            except TypeError:
+                raise BridgeCutException('Bad Job.')
+            
+            self.reply(202, job.status())
+        except BridgeCutException:
+            self.error()
+    
+    def do_PUT(self):
+        """
+        Loads a graph.
+        """
+        path = self.path.strip('/').split('/')
+        if len(path) != 2 or path[0] != 'graphs':
+            self.reply(404, {'error': 'Not Found.'})
+            return
+        
+        items = [line.replace('\t', ' ').replace('\r', '').split(' ') for line in self.body().split('\n')]
+        items = [item[:2] for item in items if len(item) >= 2]
+        
+        size = self.service.load(path[1], items)
+        self.reply(201, {'graph': path[1], 'nodes': size['nodes'], 'edges': size['edges']})
+    
+    def error(self):
+        """
+        Replies with the service error being handled.
+        """
+        message = str(sys.exc_info()[1])
+        self.reply(self.ERRORS.get(message, 400), {'error': message})
+    
+    def id(self, value):
+        """
+        Parses a job id.
+        
+        Key arguments:
+        value -- the id from the path.
+        """
+        try:
+            return int(value)
+        except ValueError:
+            raise BridgeCutException('Job Not Found.')
+    
+    def reply(self, code, data):
+        """
+        Sends a JSON reply.
+        
+        Key arguments:
+        code -- the status code.
+        data -- the data to send.
+        """
+        body = json.dumps(data)
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def main():
+    """Main execution method."""
+    # Determine command line arguments.
+    try:
+        rawopts, args = getopt.getopt(sys.argv[1:], "p:w:q:")
+    except getopt.GetoptError:
+        usage()
+        sys.exit(2)
+    
+    opts = {}
+    
+    # Process each command line argument.
+    for o, a in rawopts:
+        opts[o[1]] = a
+    
+    service = Service(int(opts.get('w', 2)), int(opts.get('q', 100)))
+    
+    # Graphs to load up front, given as name=file.
+    for arg in args:
+        if not '=' in arg:
+            usage()
+            sys.exit(2)
+        name, file_name = arg.split('=', 1)
+        items = [line.replace('\t', ' ').replace('\n', '').replace('\r', '').split(' ') for line in open(file_name, 'r')]
+        service.load(name, [item[:2] for item in items if len(item) >= 2])
+    
+    Handler.service = service
+    server = Server(('localhost', int(opts.get('p', 8000))), Handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+def usage():
+    """Prints the usage of the program."""
+    print("\n" +
+          "The following arguments are optional:\n" +
+          "-p: the port to listen on (default 8000).\n" +
+          "-w: the number of worker processes (default 2).\n" +
+          "-q: the most jobs waiting to run (default 100).\n" +
+          "\n" +
+          "Any other arguments are graphs to load, given as name=file.\n" +
+          "\n" +
+          "Example Usage:\n" +
+          "python server.py -p 8000 enron2=\"../data/enron/enron2.txt\"" +
+          "\n")
+
+"""Main execution."""
+if __name__ == "__main__":
+    main()
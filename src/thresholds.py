@@ -0,0 +1,93 @@
+"""
+Clusters of a recorded run for other density thresholds.
+
+A run of main.py with -w writes its dendrogram, and every threshold up to
+the run's own is then a lookup instead of another run.  One line is
+written per threshold:
+    
+    threshold, clusters, DB index, silhouette
+
+The metrics need the graph, so they are only found with -m.
+
+@author Aaron Zampaglione <azampagl@my.fit.edu>
+@copyright 2011 Aaron Zampaglione
+@license MIT
+"""
+from bridgecut.core import BridgeCut
+from bridgecut.dendrogram import Dendrogram
+from bridgecut.graph.core import Graph
+from bridgecut.record import Record
+
+import getopt
+import sys
+
+def main():
+    """Main execution method."""
+    # Determine command line arguments.
+    try:
+        rawopts, _ = getopt.getopt(sys.argv[1:], "d:t:mc")
+    except getopt.GetoptError:
+        usage()
+        sys.exit(2)
+    
+    opts = {}
+    
+    # Process each command line argument.
+    for o, a in rawopts:
+        opts[o[1]] = a
+    
+    # The following arguments are required in all cases.
+    for opt in ['d', 't']:
+        if not opt in opts:
+            usage()
+            sys.exit(2)
+    
+    tree = Dendrogram.load(opts['d'])
+    
+    # The graph the run was made on.
+    graph = None
+    if 'm' in opts:
+        record = Record(opts['d'])
+        source = record.value('source')
+        record.close()
+        
+        items = [line.replace('\t', ' ').replace('\n', '').replace('\r', '').split(' ') for line in open(source, 'r')]
+        graph = Graph.factory([item[:2] for item in items if len(item) >= 2])
+    
+    for t in opts['t'].split(','):
+        # Pieces denser than the run's threshold were never cut.
+        if float(t) > tree.t:
+            print(t + '\tabove the recorded threshold')
+            continue
+        
+        clusters = tree.clusters(float(t))
+        
+        line = [t, str(len(clusters))]
+        if graph:
+            subgraphs = tree.subgraphs(graph, float(t))
+            line.append(str(BridgeCut.davies_bouldin(graph, subgraphs)))
+            line.append(str(BridgeCut.silhouette(graph, subgraphs)))
+        print('\t'.join(line))
+        
+        if 'c' in opts:
+            for values in clusters:
+                print('\t' + ', '.join(values))
+
+def usage():
+    """Prints the usage of the program."""
+    print("\n" +
+          "The following are arguments required:\n" +
+          "-d: the dendrogram file written by main.py -w.\n" +
+          "-t: the density thresholds, comma separated.\n" +
+          "\n" +
+          "The following arguments are optional:\n" +
+          "-m: find the DB index and silhouette of each threshold.\n" +
+          "-c: print the clusters of each threshold.\n" +
+          "\n" +
+          "Example Usage:\n" +
+          "python thresholds.py -d \"../results/enron/enron2-edge-b.bct\" -t \".1,.2,.3\" -m" +
+          "\n")
+
+"""Main execution."""
+if __name__ == "__main__":
+    main()